@@ -0,0 +1,287 @@
+from array import array
+from collections import OrderedDict
+import threading
+import time
+from uuid import uuid4
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+from api.constants import (
+    RECIPE_FRAGMENT_CACHE_TIMEOUT,
+    SHORT_LINK_CACHE_TIMEOUT,
+    SHORT_LINK_LOCAL_CACHE_SIZE,
+    SHORT_LINK_LOCAL_CACHE_TIMEOUT,
+    SHORT_LINK_MISSING_TIMEOUT,
+    USER_RECIPE_IDS_CACHE_TIMEOUT,
+    VERSION_CACHE_TIMEOUT,
+)
+from recipes.models import Recipe, ShoppingCart, ShortLinkAlias
+
+
+INGREDIENTS_VERSION_KEY = 'catalog:ingredients:version'
+TAGS_VERSION_KEY = 'catalog:tags:version'
+
+
+def get_version_timeout():
+    """Время жизни версий: без ограничения в общем кеше.
+
+    Кеш процесса не видит сбросы из других процессов (например, из
+    команд manage.py), поэтому в нем версия живет VERSION_CACHE_TIMEOUT
+    и данные обновляются не позже этого срока.
+    """
+    if isinstance(caches['default'], (LocMemCache, DummyCache)):
+        return VERSION_CACHE_TIMEOUT
+    return None
+
+
+def get_version(key):
+    """Текущая версия кешируемых данных по ключу.
+
+    Версия - случайная строка, поэтому после сброса или вытеснения ключа
+    из кеша старые данные и ETag никогда не совпадут с новыми. Новая
+    версия записывается через add: при одновременном промахе все
+    процессы получат версию, записанную первым.
+    """
+    version = cache.get(key)
+    if version is None:
+        version = uuid4().hex
+        if not cache.add(key, version, get_version_timeout()):
+            version = cache.get(key) or version
+    return version
+
+
+def get_versions(keys):
+    """Версии для набора ключей за одно обращение к кешу.
+
+    Отсутствующие версии создаются по одной через get_version.
+    """
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            versions[key] = get_version(key)
+    return versions
+
+
+def bump_version(*keys):
+    """Сброс версий по ключам после фиксации текущей транзакции.
+
+    Иначе параллельный запрос может закешировать еще не обновленные
+    данные под новой версией.
+    """
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def bump_catalog_version():
+    """Сброс кеша справочников тегов и ингредиентов."""
+    bump_version(INGREDIENTS_VERSION_KEY, TAGS_VERSION_KEY)
+
+
+def catalog_key(version_key, version):
+    return f'{version_key}:{version}'
+
+
+def user_list_version_key(model, user_id):
+    """Ключ версии пользовательского списка (избранного/корзины)."""
+    return f'{model._meta.model_name}:version:{user_id}'
+
+
+def bump_user_list_version(model, *user_ids):
+    """Сброс версии списка для указанных пользователей."""
+    bump_version(*(
+        user_list_version_key(model, user_id) for user_id in user_ids
+    ))
+
+
+def get_user_recipe_ids(model, user):
+    """Множество id рецептов в избранном или корзине пользователя.
+
+    В кеше id хранятся компактным отсортированным массивом под версией
+    списка, поэтому избранное на тысячи рецептов читается одним
+    обращением к кешу, а не подзапросом на каждый рецепт страницы.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+    version = get_version(user_list_version_key(model, user.pk))
+    key = f'{model._meta.model_name}:recipe_ids:{user.pk}:{version}'
+    recipe_ids = cache.get(key)
+    if recipe_ids is None:
+        recipe_ids = array('q', sorted(model.objects.filter(
+            user=user
+        ).values_list('recipe_id', flat=True)))
+        cache.set(key, recipe_ids, USER_RECIPE_IDS_CACHE_TIMEOUT)
+    return frozenset(recipe_ids)
+
+
+def shopping_cart_ingredients_key(user_id, version):
+    return f'shopping_cart:ingredients:{user_id}:{version}'
+
+
+def get_shopping_cart_version(user_id):
+    """Текущая версия корзины пользователя.
+
+    Включает версию справочника ингредиентов: переименование ингредиента
+    или смена единицы измерения меняет ETag и ключ агрегата.
+    """
+    cart_key = user_list_version_key(ShoppingCart, user_id)
+    versions = get_versions([cart_key, INGREDIENTS_VERSION_KEY])
+    return f'{versions[cart_key]}-{versions[INGREDIENTS_VERSION_KEY]}'
+
+
+def bump_recipe_shopping_carts(recipe):
+    """Сброс версии корзины у всех, кто добавил рецепт в покупки."""
+    bump_user_list_version(ShoppingCart, *ShoppingCart.objects.filter(
+        recipe=recipe
+    ).values_list('user_id', flat=True))
+
+
+def recipe_version_key(recipe_id):
+    return f'recipe:version:{recipe_id}'
+
+
+def user_version_key(user_id):
+    return f'user:version:{user_id}'
+
+
+def get_recipe_fragments(recipes, build, prefix=''):
+    """Кешированные фрагменты представления рецептов по их id.
+
+    Ключ фрагмента включает версии рецепта, его автора и справочников,
+    build(recipe) вызывается только для рецептов без актуального
+    фрагмента. Версии и фрагменты читаются пакетно.
+    """
+    version_keys = {TAGS_VERSION_KEY, INGREDIENTS_VERSION_KEY}
+    for recipe in recipes:
+        version_keys.add(recipe_version_key(recipe.pk))
+        version_keys.add(user_version_key(recipe.author_id))
+    versions = get_versions(list(version_keys))
+    catalog_version = (
+        f'{versions[TAGS_VERSION_KEY]}:{versions[INGREDIENTS_VERSION_KEY]}'
+    )
+    keys = {
+        recipe.pk: (
+            f'recipe:fragment:{prefix}:{recipe.pk}:'
+            f'{versions[recipe_version_key(recipe.pk)]}:'
+            f'{versions[user_version_key(recipe.author_id)]}:'
+            f'{catalog_version}'
+        )
+        for recipe in recipes
+    }
+    cached = cache.get_many(list(keys.values()))
+    fragments = {}
+    missing = {}
+    for recipe in recipes:
+        key = keys[recipe.pk]
+        if key in cached:
+            fragments[recipe.pk] = cached[key]
+        else:
+            fragments[recipe.pk] = missing[key] = build(recipe)
+    if missing:
+        cache.set_many(missing, RECIPE_FRAGMENT_CACHE_TIMEOUT)
+    return fragments
+
+
+def iterate_and_cache(rows, key, timeout):
+    """Отдает строки по мере чтения и кеширует их после полного прохода."""
+    collected = []
+    for row in rows:
+        collected.append(row)
+        yield row
+    cache.set(key, collected, timeout)
+
+
+class LocalLRUCache:
+    """Ограниченный кеш в памяти процесса с временем жизни записей.
+
+    Время жизни ограничивает устаревание записей, сброшенных в общем
+    кеше другим процессом.
+    """
+
+    def __init__(self, maxsize, timeout):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del self.data[key]
+                return None
+            self.data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.data[key] = (value, time.monotonic() + self.timeout)
+            self.data.move_to_end(key)
+            if len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.data.pop(key, None)
+
+
+short_link_cache = LocalLRUCache(
+    SHORT_LINK_LOCAL_CACHE_SIZE, SHORT_LINK_LOCAL_CACHE_TIMEOUT
+)
+
+# Отметка несуществующей ссылки, None в кеше означает промах.
+SHORT_LINK_MISSING = 0
+
+
+def short_link_key(slug):
+    return f'short_link:{slug}'
+
+
+def find_short_link(slug):
+    """id рецепта по текущей или прежней короткой ссылке в БД."""
+    recipe_id = Recipe.objects.filter(slug=slug).values_list(
+        'id', flat=True
+    ).first()
+    if recipe_id is None:
+        recipe_id = ShortLinkAlias.objects.filter(slug=slug).values_list(
+            'recipe_id', flat=True
+        ).first()
+    return recipe_id
+
+
+def resolve_short_link(slug):
+    """id рецепта по короткой ссылке или None.
+
+    Сначала проверяется кеш процесса, затем общий кеш и только потом БД.
+    Прежние ссылки, замененные командой shortenlinks, ищутся среди
+    ShortLinkAlias. Неизвестные ссылки тоже кешируются, но на меньшее
+    время.
+    """
+    key = short_link_key(slug)
+    recipe_id = short_link_cache.get(key)
+    if recipe_id is None:
+        recipe_id = cache.get(key)
+        if recipe_id is None:
+            recipe_id = find_short_link(slug) or SHORT_LINK_MISSING
+            cache.set(key, recipe_id, (
+                SHORT_LINK_CACHE_TIMEOUT if recipe_id
+                else SHORT_LINK_MISSING_TIMEOUT
+            ))
+        short_link_cache.set(key, recipe_id)
+    return recipe_id or None
+
+
+def forget_short_links(*slugs):
+    """Сброс закешированных коротких ссылок после фиксации транзакции."""
+    keys = [short_link_key(slug) for slug in slugs]
+
+    def forget():
+        cache.delete_many(keys)
+        for key in keys:
+            short_link_cache.delete(key)
+
+    transaction.on_commit(forget)
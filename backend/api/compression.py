@@ -0,0 +1,46 @@
+import gzip
+import re
+
+from api.constants import BROTLI_QUALITY, GZIP_LEVEL
+
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+re_accepts_gzip = re.compile(r'\bgzip\b')
+re_accepts_brotli = re.compile(r'\bbr\b')
+
+
+def choose_encoding(request, streaming=False):
+    """Лучшее из поддерживаемых клиентом сжатий или None.
+
+    Brotli применяется только к готовому телу ответа, потоковые ответы
+    сжимаются gzip.
+    """
+    accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    if (
+        brotli is not None
+        and not streaming
+        and re_accepts_brotli.search(accept_encoding)
+    ):
+        return 'br'
+    if re_accepts_gzip.search(accept_encoding):
+        return 'gzip'
+    return None
+
+
+def compress(content, encoding, gzip_level=GZIP_LEVEL,
+             brotli_quality=BROTLI_QUALITY):
+    if encoding == 'br':
+        return brotli.compress(content, quality=brotli_quality)
+    return gzip.compress(content, compresslevel=gzip_level, mtime=0)
+
+
+def weaken_etag(response):
+    """Сжатое тело - другое представление, поэтому ETag становится слабым."""
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = f'W/{etag}'
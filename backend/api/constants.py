@@ -1,2 +1,58 @@
 MAX_LENGTH = 200
 MAX_PAGE_SIZE = 100
+SHOPPING_LIST_CHUNK_SIZE = 500
+SHOPPING_LIST_TITLE = 'Список покупок:'
+PDF_FONT_NAME = 'ShoppingListFont'
+PDF_FONT_SIZE = 12
+PDF_LINE_HEIGHT = 18
+PDF_MARGIN = 50
+SHOPPING_CART_CACHE_TIMEOUT = 60 * 60 * 24
+INGREDIENT_SEARCH_LIMIT = 50
+CATALOG_CACHE_TIMEOUT = 60 * 60 * 24
+RECIPE_FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+COUNT_CACHE_TIMEOUT = 30
+VERSION_CACHE_TIMEOUT = 60 * 10
+APPROXIMATE_COUNT_THRESHOLD = 10000
+USER_RECIPE_IDS_CACHE_TIMEOUT = 60 * 60 * 24
+RECIPE_LIST_FIELDS = (
+    'id', 'name', 'text', 'cooking_time', 'image', 'image_variants',
+    'pub_date', 'author_id', 'author__id', 'author__email',
+    'author__username', 'author__first_name', 'author__last_name',
+    'author__avatar', 'author__avatar_variants',
+)
+RECIPE_LIST_INGREDIENT_FIELDS = (
+    'id', 'recipe_id', 'amount',
+    'ingredient__id', 'ingredient__name', 'ingredient__measurement_unit',
+)
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+PRECOMPRESSED_GZIP_LEVEL = 9
+PRECOMPRESSED_BROTLI_QUALITY = 11
+COMPRESSIBLE_CONTENT_TYPES = ('application/json', 'text/')
+IMAGE_VARIANT_SIZES = {
+    'thumbnail': (160, 160),
+    'card': (480, 480),
+    'full': (1280, 1280),
+}
+IMAGE_FORMAT_OPTIONS = {
+    'avif': {'quality': 60},
+    'webp': {'quality': 80, 'method': 4},
+    'jpeg': {'quality': 85, 'optimize': True, 'progressive': True},
+}
+IMAGE_FORMAT_ALIASES = {'mpo': 'jpeg'}
+IMAGE_FORMAT_EXTENSIONS = {'avif': 'avif', 'webp': 'webp', 'jpeg': 'jpg'}
+BASE64_CHUNK_SIZE = 64 * 1024
+MEDIA_CLEANUP_GRACE_PERIOD = 60 * 60
+SHORT_LINK_CACHE_TIMEOUT = 60 * 60 * 24
+SHORT_LINK_MISSING_TIMEOUT = 60
+SHORT_LINK_LOCAL_CACHE_SIZE = 10000
+SHORT_LINK_LOCAL_CACHE_TIMEOUT = 60
+SHORT_LINK_REDIRECT_MAX_AGE = 60 * 5
+USER_LIST_RECIPE_FIELDS = (
+    'id', 'name', 'image', 'image_variants', 'cooking_time',
+)
+BULK_IDS_LIMIT = 100
+RECIPE_ORDERINGS = {
+    'popular': ('-favorite_count', '-pub_date', '-id'),
+    'in_carts': ('-shopping_cart_count', '-pub_date', '-id'),
+}
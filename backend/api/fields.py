@@ -1,16 +1,235 @@
 import base64
+import binascii
+import io
+import re
 
-from django.core.files.base import ContentFile
+from PIL import Image
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import (
+    InMemoryUploadedFile,
+    TemporaryUploadedFile,
+)
 from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
+
+from api.constants import BASE64_CHUNK_SIZE, IMAGE_FORMAT_ALIASES
+
+
+WHITESPACE = re.compile(r'\s')
 
 
 class Base64ImageField(serializers.ImageField):
-    """Обработка изображения в формате Base64"""
+    """Обработка изображения в формате Base64.
+
+    Строка декодируется частями, как при обычной multipart-загрузке:
+    изображения больше FILE_UPLOAD_MAX_MEMORY_SIZE пишутся во временный
+    файл на диске. Размер проверяется по длине строки, формат и число
+    пикселей - по заголовку изображения уже в первой декодированной
+    части, поэтому данные, не являющиеся изображением, отклоняются
+    без декодирования всей строки.
+    Переносы строк и пробелы в данных (base64.encodebytes) допускаются.
+    """
+
+    default_error_messages = {
+        'invalid_base64': 'Некорректные данные изображения в Base64.',
+        'max_size': 'Размер изображения не должен превышать {max_size} байт.',
+        'max_pixels': (
+            'Изображение не должно содержать больше {max_pixels} пикселей.'
+        ),
+        'format': 'Допустимые форматы изображения: {formats}.',
+    }
 
     def to_internal_value(self, data):
         if isinstance(data, str) and data.startswith('data:image'):
-            format, imgstr = data.split(';base64,')
-            ext = format.split('/')[-1]
-            data = ContentFile(base64.b64decode(imgstr), name=f'image.{ext}')
-
+            data = self.decode(data)
         return super().to_internal_value(data)
+
+    def decode(self, data):
+        separator = data.find(';base64,')
+        if separator == -1:
+            self.fail('invalid_base64')
+        ext = data[:separator].split('/')[-1]
+        # Данные декодируются прямо из исходной строки, без копии
+        # полезной нагрузки; копия нужна, только если есть пробелы.
+        start = separator + len(';base64,')
+        if WHITESPACE.search(data, start):
+            data = ''.join(data[start:].split())
+            start = 0
+        size = (len(data) - start) * 3 // 4 - data.count('=', -2)
+        if size > settings.IMAGE_UPLOAD_MAX_SIZE:
+            self.fail('max_size', max_size=settings.IMAGE_UPLOAD_MAX_SIZE)
+
+        file = self.create_file(f'image.{ext}', size)
+        try:
+            # Длина части кратна 4, поэтому части декодируются независимо.
+            for offset in range(start, len(data), BASE64_CHUNK_SIZE):
+                file.write(base64.b64decode(
+                    data[offset:offset + BASE64_CHUNK_SIZE], validate=True
+                ))
+                if offset == start:
+                    self.check_header(file, complete=False)
+        except (binascii.Error, ValueError):
+            file.close()
+            self.fail('invalid_base64')
+        self.check_header(file)
+        return file
+
+    @staticmethod
+    def create_file(name, size):
+        if size > settings.FILE_UPLOAD_MAX_MEMORY_SIZE:
+            return TemporaryUploadedFile(name, 'image', size, None)
+        return InMemoryUploadedFile(
+            io.BytesIO(), None, name, 'image', size, None
+        )
+
+    def check_header(self, file, complete=True):
+        """Проверка формата и размеров изображения.
+
+        Image.open читает только заголовок, пиксели не декодируются.
+        В первой части данных (complete=False) заголовок может не
+        поместиться целиком, например у JPEG с большим блоком EXIF:
+        тогда формат определяется по сигнатуре файла, а размеры
+        проверяются после декодирования всей строки.
+        """
+        file.seek(0)
+        try:
+            with Image.open(file) as image:
+                image_format = (image.format or '').lower()
+                width, height = image.size
+        except Image.DecompressionBombError:
+            file.close()
+            self.fail('invalid_image')
+        except OSError:
+            file.seek(0)
+            image_format = None if complete else sniff_format(file.read(16))
+            if image_format is None:
+                file.close()
+                self.fail('invalid_image')
+            width = height = 0
+        image_format = IMAGE_FORMAT_ALIASES.get(image_format, image_format)
+        formats = settings.IMAGE_UPLOAD_FORMATS
+        if image_format not in formats:
+            file.close()
+            self.fail('format', formats=', '.join(formats))
+        if width * height > settings.IMAGE_UPLOAD_MAX_PIXELS:
+            file.close()
+            self.fail(
+                'max_pixels', max_pixels=settings.IMAGE_UPLOAD_MAX_PIXELS
+            )
+        file.seek(0, io.SEEK_SET if complete else io.SEEK_END)
+
+
+def sniff_format(prefix):
+    """Допустимый формат изображения по первым байтам файла или None."""
+    Image.init()
+    for image_format in settings.IMAGE_UPLOAD_FORMATS:
+        _, accept = Image.OPEN.get(image_format.upper(), (None, None))
+        if accept is not None and accept(prefix) is True:
+            return image_format
+    return None
+
+
+def image_url(image, request=None):
+    """URL изображения в том же виде, что выводит Base64ImageField."""
+    if not image:
+        return None
+    if request is not None:
+        return request.build_absolute_uri(image.url)
+    return image.url
+
+
+def variant_urls(variants, request=None):
+    """URL вариантов изображения по размерам и форматам.
+
+    Пока варианты не построены, возвращается None и клиент использует
+    исходное изображение.
+    """
+    if not variants:
+        return None
+    return {
+        variant: {
+            image_format: (
+                request.build_absolute_uri(default_storage.url(name))
+                if request is not None else default_storage.url(name)
+            )
+            for image_format, name in formats.items()
+        }
+        for variant, formats in variants['variants'].items()
+    }
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """Варианты изображения с абсолютными URL, как у Base64ImageField."""
+
+    def to_representation(self, value):
+        return variant_urls(value, self.context.get('request'))
+
+
+class BulkManyRelatedField(serializers.ManyRelatedField):
+    """Список связанных объектов, загружаемых одним запросом.
+
+    В отличие от ManyRelatedField, сообщает обо всех неверных
+    значениях сразу, а не только о первом.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        self.child_relation.preload(data)
+        values = []
+        errors = []
+        for item in data:
+            try:
+                values.append(self.child_relation.to_internal_value(item))
+            except serializers.ValidationError as exc:
+                errors.extend(exc.detail)
+        if errors:
+            raise serializers.ValidationError(errors)
+        return values
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """PrimaryKeyRelatedField с предварительной загрузкой через id__in.
+
+    После preload значения ищутся в загруженном словаре без запросов
+    к БД, сообщения об ошибках остаются прежними.
+    """
+
+    preloaded = None
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
+
+    def coerce(self, data):
+        if isinstance(data, bool):
+            raise TypeError
+        return self.get_queryset().model._meta.pk.to_python(data)
+
+    def preload(self, data):
+        pks = set()
+        for item in data:
+            try:
+                pks.add(self.coerce(item))
+            except (TypeError, ValueError, DjangoValidationError):
+                continue
+        self.preloaded = self.get_queryset().in_bulk(pks)
+
+    def to_internal_value(self, data):
+        if self.preloaded is None:
+            return super().to_internal_value(data)
+        try:
+            pk = self.coerce(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in self.preloaded:
+            self.fail('does_not_exist', pk_value=data)
+        return self.preloaded[pk]
@@ -1,11 +1,22 @@
+from django.db.models import Exists, OuterRef
 from django_filters.rest_framework import (
     BooleanFilter,
     CharFilter,
+    ChoiceFilter,
     FilterSet,
-    ModelMultipleChoiceFilter,
+    MultipleChoiceFilter,
 )
 
-from recipes.models import Ingredient, Recipe, Tag
+from api.cache import get_user_recipe_ids
+from api.constants import RECIPE_ORDERINGS
+from api.search import tag_slug_index
+from api.utils import RECIPE_USER_LISTS
+from recipes.models import Ingredient, Recipe
+
+
+def get_tag_choices():
+    """Допустимые слаги тегов из индекса в памяти."""
+    return tag_slug_index.choices()
 
 
 class IngredientFilter(FilterSet):
@@ -22,14 +33,49 @@ class IngredientFilter(FilterSet):
 
 
 class RecipeFilter(FilterSet):
-    tags = ModelMultipleChoiceFilter(field_name='tags__slug',
-                                     to_field_name='slug',
-                                     queryset=Tag.objects.all())
-    is_favorited = BooleanFilter(
-        field_name='is_favorited')
-    is_in_shopping_cart = BooleanFilter(
-        field_name='is_in_shopping_cart')
+    tags = MultipleChoiceFilter(
+        choices=get_tag_choices,
+        method='filter_tags'
+    )
+    is_favorited = BooleanFilter(method='filter_user_list')
+    is_in_shopping_cart = BooleanFilter(method='filter_user_list')
+    ordering = ChoiceFilter(
+        choices=[(name, name) for name in RECIPE_ORDERINGS],
+        method='filter_ordering'
+    )
 
     class Meta:
         model = Recipe
-        fields = ('tags', 'author', 'is_favorited', 'is_in_shopping_cart')
+        fields = (
+            'tags', 'author', 'is_favorited', 'is_in_shopping_cart',
+            'ordering'
+        )
+
+    def filter_tags(self, queryset, name, value):
+        """Рецепты с любым из выбранных тегов без JOIN и DISTINCT.
+
+        Слаги переводятся в id по индексу в памяти, отбор идет через
+        EXISTS по таблице связей рецептов и тегов.
+        """
+        if not value:
+            return queryset
+        return queryset.filter(Exists(Recipe.tags.through.objects.filter(
+            recipe_id=OuterRef('pk'),
+            tag_id__in=tag_slug_index.get_ids(value)
+        )))
+
+    def filter_user_list(self, queryset, name, value):
+        """Отбор по избранному или корзине через id IN по списку из кеша."""
+        recipe_ids = get_user_recipe_ids(
+            RECIPE_USER_LISTS[name], self.request.user
+        )
+        if value:
+            return queryset.filter(id__in=recipe_ids)
+        return queryset.exclude(id__in=recipe_ids)
+
+    def filter_ordering(self, queryset, name, value):
+        """Сортировка по счетчикам рецепта, например ?ordering=popular.
+
+        В режиме курсора порядок задает пагинатор (pub_date, id).
+        """
+        return queryset.order_by(*RECIPE_ORDERINGS[value])
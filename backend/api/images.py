@@ -0,0 +1,171 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+import logging
+import os
+
+from PIL import Image, ImageOps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+
+from api.cache import bump_version, recipe_version_key, user_version_key
+from api.constants import (
+    IMAGE_FORMAT_EXTENSIONS,
+    IMAGE_FORMAT_OPTIONS,
+    IMAGE_VARIANT_SIZES,
+)
+from recipes.models import Recipe
+
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+Image.init()
+# AVIF доступен не во всех сборках Pillow, JPEG остается запасным.
+IMAGE_FORMATS = tuple(
+    image_format for image_format in IMAGE_FORMAT_OPTIONS
+    if image_format.upper() in Image.SAVE
+)
+
+# Модель: (поле изображения, поле вариантов, ключ версии представления).
+IMAGE_FIELDS = {
+    Recipe: ('image', 'image_variants', recipe_version_key),
+    User: ('avatar', 'avatar_variants', user_version_key),
+}
+
+_executor = None
+
+
+def get_executor():
+    """Пул потоков обработки изображений, создается после fork воркера."""
+    global _executor
+    if _executor is None and settings.IMAGE_WORKERS:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_WORKERS,
+            thread_name_prefix='images',
+        )
+    return _executor
+
+
+def variant_name(directory, name, variant, image_format):
+    stem = os.path.splitext(os.path.basename(name))[0]
+    extension = IMAGE_FORMAT_EXTENSIONS[image_format]
+    return os.path.join(
+        directory, 'variants', f'{stem}_{variant}.{extension}'
+    )
+
+
+def encode(image, image_format):
+    if image_format == 'jpeg' and image.mode == 'RGBA':
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    buffer = BytesIO()
+    image.save(buffer, image_format, **IMAGE_FORMAT_OPTIONS[image_format])
+    return buffer.getvalue()
+
+
+def render_variants(name, directory):
+    """Уменьшенные копии изображения во всех доступных форматах."""
+    with default_storage.open(name) as file:
+        image = ImageOps.exif_transpose(Image.open(file))
+        has_alpha = (
+            image.mode in ('RGBA', 'LA')
+            or 'transparency' in image.info
+        )
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+    variants = {}
+    for variant, size in IMAGE_VARIANT_SIZES.items():
+        resized = image.copy()
+        resized.thumbnail(size, Image.LANCZOS)
+        variants[variant] = {
+            image_format: default_storage.save(
+                variant_name(directory, name, variant, image_format),
+                ContentFile(encode(resized, image_format)),
+            )
+            for image_format in IMAGE_FORMATS
+        }
+    return variants
+
+
+def process_image(model, pk, force=False):
+    """Построение вариантов изображения объекта.
+
+    Варианты записываются через update, только если изображение
+    не сменилось за время обработки. Файлы вариантов могут быть общими
+    для нескольких объектов, старые удаляет команда cleanmedia.
+    """
+    field, variants_field, version_key = IMAGE_FIELDS[model]
+    instance = model.objects.filter(pk=pk).only(
+        field, variants_field
+    ).first()
+    if instance is None:
+        return
+    name = getattr(instance, field).name or ''
+    old_variants = getattr(instance, variants_field)
+    if not force and old_variants.get('source', '') == name:
+        return
+    directory = model._meta.get_field(field).upload_to
+    new_variants = (
+        {'source': name, 'variants': render_variants(name, directory)}
+        if name else {}
+    )
+    same_image = (
+        Q(**{field: name}) if name
+        else Q(**{field: ''}) | Q(**{f'{field}__isnull': True})
+    )
+    updated = model.objects.filter(same_image, pk=pk).update(
+        **{variants_field: new_variants}
+    )
+    if updated:
+        bump_version(version_key(pk))
+
+
+def process_image_safely(model, pk):
+    """process_image с записью ошибки в лог вместо исключения.
+
+    Ошибка обработки не должна отменять ответ на уже сохраненный
+    объект и остальные хуки on_commit.
+    """
+    try:
+        process_image(model, pk)
+    except Exception:
+        logger.exception(
+            'Ошибка обработки изображения %s %s', model.__name__, pk
+        )
+
+
+def run_in_background(model, pk):
+    try:
+        process_image_safely(model, pk)
+    finally:
+        close_old_connections()
+
+
+def schedule_image_processing(instance, update_fields=None):
+    """Постановка обработки изображения в пул после коммита.
+
+    Ничего не делает, если варианты уже построены для текущего файла.
+    Без пула (IMAGE_WORKERS = 0) обработка выполняется сразу после
+    коммита в том же потоке.
+    """
+    model = type(instance)
+    field, variants_field, _ = IMAGE_FIELDS[model]
+    if update_fields and field not in update_fields:
+        return
+    name = getattr(instance, field).name or ''
+    if getattr(instance, variants_field).get('source', '') == name:
+        return
+
+    def submit():
+        executor = get_executor()
+        if executor is None:
+            process_image_safely(model, instance.pk)
+        else:
+            executor.submit(run_in_background, model, instance.pk)
+
+    transaction.on_commit(submit)
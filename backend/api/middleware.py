@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
+
+from api.compression import choose_encoding, compress, weaken_etag
+from api.constants import COMPRESSIBLE_CONTENT_TYPES
+
+
+class CompressionMiddleware:
+    """Сжатие текстовых ответов API через brotli или gzip.
+
+    Сжимаются ответы с текстовыми типами содержимого не короче
+    COMPRESSION_MIN_SIZE байт. Ответы, у которых уже задан
+    Content-Encoding (например, заранее сжатые справочники),
+    не трогаются.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.is_compressible(response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request, streaming=response.streaming)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_sequence(
+                response.streaming_content
+            )
+            del response['Content-Length']
+        else:
+            content = compress(response.content, encoding)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+
+        weaken_etag(response)
+        response['Content-Encoding'] = encoding
+        return response
+
+    @staticmethod
+    def is_compressible(response):
+        if response.has_header('Content-Encoding'):
+            return False
+        if 'no-transform' in response.get('Cache-Control', ''):
+            return False
+        content_type = response.get('Content-Type', '')
+        if not content_type.startswith(COMPRESSIBLE_CONTENT_TYPES):
+            return False
+        return response.streaming or (
+            len(response.content) >= settings.COMPRESSION_MIN_SIZE
+        )
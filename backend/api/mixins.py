@@ -0,0 +1,116 @@
+from abc import ABCMeta, abstractmethod
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date
+from rest_framework.serializers import SerializerMetaclass
+
+from api.cache import catalog_key, get_version
+from api.compression import brotli, choose_encoding, compress
+from api.constants import (
+    CATALOG_CACHE_TIMEOUT,
+    PRECOMPRESSED_BROTLI_QUALITY,
+    PRECOMPRESSED_GZIP_LEVEL,
+)
+from api.renderers import FastJSONRenderer
+
+
+class CachedCatalogMixin:
+    """Кеширование списка справочника в виде готового JSON.
+
+    Ответ без параметров запроса сериализуется один раз на версию
+    catalog_version_key и хранится в кеше вместе с ETag и временем
+    сборки, поэтому клиенты и nginx могут перепроверять его через
+    If-None-Match/If-Modified-Since. Там же лежат заранее сжатые
+    с максимальной степенью варианты gzip и br.
+    """
+
+    catalog_version_key = None
+
+    def build_catalog_entry(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        if settings.FAST_SERIALIZERS:
+            data = list(
+                queryset.values(*self.get_serializer_class().Meta.fields)
+            )
+        else:
+            data = self.get_serializer(queryset, many=True).data
+        content = FastJSONRenderer().render(data)
+        encodings = {'gzip': compress(
+            content, 'gzip', gzip_level=PRECOMPRESSED_GZIP_LEVEL
+        )}
+        if brotli is not None:
+            encodings['br'] = compress(
+                content, 'br', brotli_quality=PRECOMPRESSED_BROTLI_QUALITY
+            )
+        return {
+            'content': content,
+            'encodings': encodings,
+            'etag': f'"{hashlib.md5(content).hexdigest()}"',
+            'last_modified': int(time.time()),
+        }
+
+    def get_catalog_entry(self):
+        key = catalog_key(
+            self.catalog_version_key, get_version(self.catalog_version_key)
+        )
+        entry = cache.get(key)
+        if entry is None:
+            entry = self.build_catalog_entry()
+            cache.set(key, entry, CATALOG_CACHE_TIMEOUT)
+        return entry
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params:
+            return super().list(request, *args, **kwargs)
+        entry = self.get_catalog_entry()
+        response = get_conditional_response(
+            request,
+            etag=entry['etag'],
+            last_modified=entry['last_modified'],
+        )
+        etag = entry['etag']
+        if response is None:
+            encoding = choose_encoding(request)
+            content = entry['encodings'].get(encoding)
+            if content is None:
+                content = entry['content']
+            else:
+                etag = f'W/{etag}'
+            response = HttpResponse(content, content_type='application/json')
+            if content is not entry['content']:
+                response['Content-Encoding'] = encoding
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(entry['last_modified'])
+        patch_cache_control(response, public=True, no_cache=True)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+
+class FastRepresentationMeta(ABCMeta, SerializerMetaclass):
+    """ABCMeta, совместимый с метаклассом сериализаторов DRF."""
+
+
+class FastRepresentationMixin(metaclass=FastRepresentationMeta):
+    """Сборка представления обычным словарем без обхода полей DRF.
+
+    Включается настройкой FAST_SERIALIZERS. Сериализатор без
+    fast_representation нельзя создать, как любой абстрактный класс.
+    """
+
+    @abstractmethod
+    def fast_representation(self, instance):
+        """Те же ключи и значения, что и у полного сериализатора."""
+
+    def to_representation(self, instance):
+        if settings.FAST_SERIALIZERS:
+            return self.fast_representation(instance)
+        return super().to_representation(instance)
@@ -1,12 +1,179 @@
+import base64
+from collections import OrderedDict
+import hashlib
+
 from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from api.constants import (
+    APPROXIMATE_COUNT_THRESHOLD,
+    COUNT_CACHE_TIMEOUT,
+    MAX_PAGE_SIZE,
+)
+
+
+def estimate_count(model):
+    """Оценка числа строк таблицы по статистике планировщика Postgres."""
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples FROM pg_class WHERE relname = %s',
+            [model._meta.db_table]
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class CachedCountPaginator(Paginator):
+    """Пагинатор с кешируемым и приближенным подсчетом строк.
 
-from api.constants import MAX_PAGE_SIZE
+    Для запроса без условий по большой таблице берется оценка
+    планировщика, иначе точный COUNT кешируется на COUNT_CACHE_TIMEOUT
+    по тексту SQL-запроса, который включает все фильтры и пользователя.
+    """
+
+    approximate = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return len(queryset)
+        if not queryset.query.where:
+            estimate = estimate_count(queryset.model)
+            if (
+                estimate is not None
+                and estimate >= APPROXIMATE_COUNT_THRESHOLD
+            ):
+                self.approximate = True
+                return estimate
+        try:
+            sql = str(queryset.query)
+        except EmptyResultSet:
+            return 0
+        key = f'count:{hashlib.md5(sql.encode()).hexdigest()}'
+        return cache.get_or_set(key, queryset.count, COUNT_CACHE_TIMEOUT)
 
 
 class PageNumberLimitPagination(PageNumberPagination):
-    """Кастомный пагинатор для вывода 6 элементов на странице."""
+    """Кастомный пагинатор для вывода 6 элементов на странице.
+
+    Если количество объектов оценено приближенно, в ответ добавляется
+    флаг count_is_approximate.
+    """
 
     page_size = settings.DEFAULT_PAGE_SIZE
     page_size_query_param = 'limit'
     max_page_size = MAX_PAGE_SIZE
+    django_paginator_class = CachedCountPaginator
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.page.paginator.approximate:
+            response.data['count_is_approximate'] = True
+        return response
+
+
+class RecipePagination(PageNumberLimitPagination):
+    """Пагинатор ленты рецептов с необязательным режимом курсора.
+
+    По умолчанию работает постранично (page/limit). Параметр ?cursor=
+    включает пагинацию по ключу (pub_date, id): следующая страница
+    выбирается условием по ключу последнего рецепта без COUNT и OFFSET.
+    """
+
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(
+            request.query_params[self.cursor_query_param]
+        )
+        self.has_cursor = cursor is not None
+        self.reverse = False
+        if cursor is None:
+            queryset = queryset.order_by('-pub_date', '-id')
+        else:
+            pub_date, pk, self.reverse = cursor
+            if self.reverse:
+                queryset = queryset.filter(pub_date__gte=pub_date).filter(
+                    Q(pub_date__gt=pub_date) | Q(id__gt=pk)
+                ).order_by('pub_date', 'id')
+            else:
+                queryset = queryset.filter(pub_date__lte=pub_date).filter(
+                    Q(pub_date__lt=pub_date) | Q(id__lt=pk)
+                ).order_by('-pub_date', '-id')
+
+        page = list(queryset[:page_size + 1])
+        self.has_more = len(page) > page_size
+        page = page[:page_size]
+        if self.reverse:
+            page.reverse()
+        self.page = page
+        return page
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if not self.page or not (self.has_more or self.reverse):
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.cursor_mode:
+            return super().get_previous_link()
+        if not self.page or not (
+            self.has_more if self.reverse else self.has_cursor
+        ):
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, recipe, reverse):
+        position = f'{recipe.pub_date.isoformat()}|{recipe.pk}|{int(reverse)}'
+        cursor = base64.urlsafe_b64encode(position.encode()).decode()
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, value):
+        """Позиция (pub_date, id, reverse) из курсора или None."""
+        if not value:
+            return None
+        try:
+            position = base64.urlsafe_b64decode(value.encode()).decode()
+            pub_date, pk, reverse = position.split('|')
+            pub_date = parse_datetime(pub_date)
+            if pub_date is None:
+                raise ValueError
+            return pub_date, int(pk), bool(int(reverse))
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
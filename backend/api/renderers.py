@@ -0,0 +1,180 @@
+from abc import ABC, abstractmethod
+import csv
+import io
+
+from django.conf import settings
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from api.constants import (
+    PDF_FONT_NAME,
+    PDF_FONT_SIZE,
+    PDF_LINE_HEIGHT,
+    PDF_MARGIN,
+    SHOPPING_LIST_TITLE,
+)
+
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    from reportlab.pdfgen import canvas
+except ImportError:
+    canvas = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSON-рендерер на orjson.
+
+    Кириллица выводится как UTF-8 без \\u-экранирования. Если orjson
+    не установлен или запрошен форматированный вывод (indent),
+    используется стандартный JSONRenderer.
+    """
+
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(
+            accepted_media_type, renderer_context or {}
+        ) is not None:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        ret = orjson.dumps(
+            data,
+            default=self.encoder.default,
+            # Ошибки ListField/DictField приходят со словарями с int-ключами.
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
+        # Как и JSONRenderer, экранируем \u2028 и \u2029,
+        # чтобы ответ оставался корректным JavaScript.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+                b'\xe2\x80\xa9', b'\\u2029'
+            )
+        return ret
+
+
+class ShoppingListRenderer(ABC, BaseRenderer):
+    """Базовый потоковый рендерер списка покупок.
+
+    Метод stream принимает итератор строк агрегата ингредиентов
+    и отдает файл по частям для StreamingHttpResponse.
+    """
+
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            # Ответы с ошибками (например, 401) выводятся обычным текстом.
+            return '\n'.join(
+                f'{key}: {value}' for key, value in data.items()
+            ).encode('utf-8')
+        return ''.join(self.stream(data)).encode(self.charset)
+
+    @staticmethod
+    def format_item(item):
+        return (
+            f"{item['ingredient__name']} "
+            f"({item['ingredient__measurement_unit']}) — "
+            f"{item['total']}"
+        )
+
+    @abstractmethod
+    def stream(self, ingredients):
+        """Части файла списка покупок."""
+
+
+class TxtShoppingListRenderer(ShoppingListRenderer):
+    """Список покупок в виде текстового файла."""
+
+    media_type = 'text/plain'
+    format = 'txt'
+
+    def stream(self, ingredients):
+        yield f'{SHOPPING_LIST_TITLE}\n\n'
+        for item in ingredients:
+            yield f'{self.format_item(item)}\n'
+
+
+class _Echo:
+    """Псевдо-буфер, возвращающий записанную строку для csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+class CsvShoppingListRenderer(ShoppingListRenderer):
+    """Список покупок в формате CSV."""
+
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def stream(self, ingredients):
+        writer = csv.writer(_Echo())
+        yield writer.writerow(('Ингредиент', 'Единица измерения', 'Всего'))
+        for item in ingredients:
+            yield writer.writerow((
+                item['ingredient__name'],
+                item['ingredient__measurement_unit'],
+                item['total'],
+            ))
+
+
+class PdfShoppingListRenderer(ShoppingListRenderer):
+    """Список покупок в формате PDF (требуется reportlab).
+
+    PDF собирается целиком и отдается одним фрагментом:
+    формат не допускает построчной записи.
+    """
+
+    media_type = 'application/pdf'
+    format = 'pdf'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            return super().render(data, accepted_media_type, renderer_context)
+        return b''.join(self.stream(data))
+
+    @staticmethod
+    def register_font():
+        if PDF_FONT_NAME not in pdfmetrics.getRegisteredFontNames():
+            pdfmetrics.registerFont(
+                TTFont(PDF_FONT_NAME, settings.SHOPPING_LIST_PDF_FONT)
+            )
+
+    def stream(self, ingredients):
+        self.register_font()
+        buffer = io.BytesIO()
+        pdf = canvas.Canvas(buffer, pagesize=A4)
+        _, height = A4
+        y = height - PDF_MARGIN
+        pdf.setFont(PDF_FONT_NAME, PDF_FONT_SIZE)
+        pdf.drawString(PDF_MARGIN, y, SHOPPING_LIST_TITLE)
+        y -= 2 * PDF_LINE_HEIGHT
+        for item in ingredients:
+            if y < PDF_MARGIN:
+                pdf.showPage()
+                pdf.setFont(PDF_FONT_NAME, PDF_FONT_SIZE)
+                y = height - PDF_MARGIN
+            pdf.drawString(PDF_MARGIN, y, self.format_item(item))
+            y -= PDF_LINE_HEIGHT
+        pdf.save()
+        yield buffer.getvalue()
+
+
+SHOPPING_LIST_RENDERERS = (
+    TxtShoppingListRenderer,
+    CsvShoppingListRenderer,
+)
+if canvas is not None:
+    SHOPPING_LIST_RENDERERS += (PdfShoppingListRenderer,)
@@ -0,0 +1,109 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+import threading
+
+from api.cache import INGREDIENTS_VERSION_KEY, TAGS_VERSION_KEY, get_version
+from api.constants import INGREDIENT_SEARCH_LIMIT
+from recipes.models import Ingredient, Tag
+
+
+class CatalogIndex(ABC):
+    """Индекс справочника в памяти процесса.
+
+    Строится при первом обращении и перестраивается, когда меняется
+    версия version_key в кеше.
+    """
+
+    version_key = None
+
+    def __init__(self):
+        self._version = None
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def build(self):
+        """Загрузка справочника из БД и построение индекса."""
+
+    def refresh(self):
+        version = get_version(self.version_key)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self.build()
+                    self._version = version
+
+
+class IngredientIndex(CatalogIndex):
+    """Индекс ингредиентов для поиска по началу названия.
+
+    Названия хранятся отсортированными в casefold-форме, поиск - бинарный.
+    """
+
+    version_key = INGREDIENTS_VERSION_KEY
+
+    def __init__(self):
+        super().__init__()
+        self._keys = []
+        self._rows = []
+
+    @staticmethod
+    def normalize(value):
+        return value.casefold()
+
+    def build(self):
+        ingredients = Ingredient.objects.values_list(
+            'id', 'name', 'measurement_unit'
+        )
+        items = sorted(
+            (self.normalize(name), name, pk, measurement_unit)
+            for pk, name, measurement_unit in ingredients
+        )
+        rows = [
+            {'id': pk, 'name': name, 'measurement_unit': measurement_unit}
+            for _, name, pk, measurement_unit in items
+        ]
+        # Ключи и строки заменяются одной операцией присваивания,
+        # чтобы параллельный поиск видел согласованный снимок.
+        self._keys, self._rows = [item[0] for item in items], rows
+
+    def search(self, prefix, limit=INGREDIENT_SEARCH_LIMIT):
+        """Ингредиенты, название которых начинается с prefix.
+
+        Точное совпадение всегда идет первым: в отсортированном списке
+        оно предшествует более длинным названиям с тем же началом.
+        """
+        self.refresh()
+        keys, rows = self._keys, self._rows
+        prefix = self.normalize(prefix)
+        start = bisect_left(keys, prefix)
+        result = []
+        for index in range(start, min(start + limit, len(keys))):
+            if not keys[index].startswith(prefix):
+                break
+            result.append(rows[index])
+        return result
+
+
+class TagSlugIndex(CatalogIndex):
+    """Соответствие слагов тегов их id."""
+
+    version_key = TAGS_VERSION_KEY
+
+    def __init__(self):
+        super().__init__()
+        self._ids = {}
+
+    def build(self):
+        self._ids = dict(Tag.objects.values_list('slug', 'id'))
+
+    def choices(self):
+        self.refresh()
+        return [(slug, slug) for slug in self._ids]
+
+    def get_ids(self, slugs):
+        self.refresh()
+        return [self._ids[slug] for slug in slugs if slug in self._ids]
+
+
+ingredient_index = IngredientIndex()
+tag_slug_index = TagSlugIndex()
@@ -1,12 +1,25 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import transaction
+from django.db import IntegrityError, models, transaction
 from rest_framework import serializers
 
-from api.fields import Base64ImageField
+from api.cache import get_recipe_fragments, get_user_recipe_ids
+from api.constants import BULK_IDS_LIMIT
+from api.fields import (
+    Base64ImageField,
+    BulkPrimaryKeyRelatedField,
+    ImageVariantsField,
+    image_url,
+    variant_urls,
+)
+from api.mixins import FastRepresentationMixin
 from api.utils import (
+    RECIPE_USER_LISTS,
+    get_recipes_limit,
     processing_recipe_ingredients_and_tags,
     validate_not_empty,
 )
+from recipes.constants import SHORT_LINK_ATTEMPTS
 from recipes.models import Ingredient, IngredientInRecipe, Recipe, Tag
 from users.models import Subscription
 
@@ -14,6 +27,41 @@ from users.models import Subscription
 User = get_user_model()
 
 
+def resolve_is_subscribed(context, author):
+    """Подписан ли текущий пользователь на автора.
+
+    Если queryset уже аннотирован полем is_subscribed, используется оно,
+    иначе id авторов загружаются одним запросом на весь запрос
+    и кешируются в общем контексте сериализаторов.
+    """
+    annotated = getattr(author, 'is_subscribed', None)
+    if annotated is not None:
+        return annotated
+    request = context.get('request')
+    if not (request and request.user.is_authenticated):
+        return False
+    if 'subscribed_ids' not in context:
+        context['subscribed_ids'] = (
+            Subscription.subscribed_author_ids(request.user)
+        )
+    return author.pk in context['subscribed_ids']
+
+
+def resolve_user_recipe_ids(context, model):
+    """id рецептов из избранного или корзины текущего пользователя.
+
+    Загружаются один раз и хранятся в общем контексте сериализаторов.
+    """
+    key = f'{model._meta.model_name}_ids'
+    if key not in context:
+        request = context.get('request')
+        context[key] = (
+            get_user_recipe_ids(model, request.user)
+            if request else frozenset()
+        )
+    return context[key]
+
+
 class BaseUserSerializer(serializers.ModelSerializer):
     """Базовый сериализатор пользователя."""
 
@@ -34,27 +82,26 @@ class BaseUserSerializer(serializers.ModelSerializer):
 
     def get_is_subscribed(self, obj):
         """Проверка подписки только для аутентифицированных пользователей."""
-        request = self.context.get('request')
-        return (
-            request
-            and request.user.is_authenticated
-            and Subscription.is_subscribed(request.user, obj)
-        )
+        return resolve_is_subscribed(self.context, obj)
 
 
 class UserSerializer(BaseUserSerializer):
     """Сериализатор для чтения данных пользователя."""
 
     avatar = serializers.SerializerMethodField()
+    avatar_variants = serializers.SerializerMethodField()
 
     class Meta(BaseUserSerializer.Meta):
-        fields = BaseUserSerializer.Meta.fields
+        fields = BaseUserSerializer.Meta.fields + ('avatar_variants',)
 
     def get_avatar(self, obj):
         if obj.avatar:
             return obj.avatar.url
         return None
 
+    def get_avatar_variants(self, obj):
+        return variant_urls(obj.avatar_variants)
+
 
 class TagSerializer(serializers.ModelSerializer):
     """Сериализатор для вывода тэгов."""
@@ -68,7 +115,10 @@ class TagSerializer(serializers.ModelSerializer):
         )
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+class IngredientSerializer(
+    FastRepresentationMixin,
+    serializers.ModelSerializer
+):
     """Сериализатор для вывода ингредиентов."""
 
     class Meta:
@@ -79,9 +129,27 @@ class IngredientSerializer(serializers.ModelSerializer):
             'measurement_unit'
         )
 
+    def fast_representation(self, instance):
+        return {
+            'id': instance.id,
+            'name': instance.name,
+            'measurement_unit': instance.measurement_unit,
+        }
+
+
+class IngredientInRecipeListSerializer(serializers.ListSerializer):
+    """Список ингредиентов рецепта с загрузкой всех id одним запросом."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.child.fields['id'].preload(
+                item.get('id') for item in data if isinstance(item, dict)
+            )
+        return super().to_internal_value(data)
+
 
 class IngredientInRecipeSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(
+    id = BulkPrimaryKeyRelatedField(
         source='ingredient',
         queryset=Ingredient.objects.all(),
     )
@@ -95,6 +163,7 @@ class IngredientInRecipeSerializer(serializers.ModelSerializer):
     class Meta:
         model = IngredientInRecipe
         fields = ('id', 'name', 'measurement_unit', 'amount')
+        list_serializer_class = IngredientInRecipeListSerializer
 
 
 class RecipeWriteSerializer(serializers.ModelSerializer):
@@ -104,7 +173,7 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         many=True,
         required=True,
     )
-    tags = serializers.PrimaryKeyRelatedField(
+    tags = BulkPrimaryKeyRelatedField(
         queryset=Tag.objects.all(),
         many=True,
         required=True,
@@ -151,9 +220,21 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
 
         return value
 
-    @transaction.atomic
     def create(self, validated_data):
-        """Создание рецепта с ингредиентами."""
+        """Создание рецепта с ингредиентами.
+
+        Совпадение кода короткой ссылки прерывает транзакцию, и она
+        повторяется целиком с новым кодом (см. Recipe.save).
+        """
+        for attempt in range(SHORT_LINK_ATTEMPTS):
+            try:
+                return self.create_recipe(dict(validated_data))
+            except IntegrityError:
+                if attempt == SHORT_LINK_ATTEMPTS - 1:
+                    raise
+
+    @transaction.atomic
+    def create_recipe(self, validated_data):
         ingredients_data = validated_data.pop("ingredients")
         tags = validated_data.pop("tags")
         validated_data['author'] = self.context['request'].user
@@ -161,7 +242,8 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         processing_recipe_ingredients_and_tags(
             recipe,
             ingredients_data,
-            tags
+            tags,
+            created=True
         )
         return recipe
 
@@ -186,6 +268,20 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         ).data
 
 
+class RecipeReadListSerializer(serializers.ListSerializer):
+    """Список рецептов с пакетным чтением кешированных фрагментов."""
+
+    def to_representation(self, data):
+        recipes = list(
+            data.all() if isinstance(data, models.Manager) else data
+        )
+        fragments = self.child.get_fragments(recipes)
+        return [
+            self.child.merge_viewer_fields(recipe, fragments[recipe.pk])
+            for recipe in recipes
+        ]
+
+
 class RecipeReadSerializer(serializers.ModelSerializer):
     """Сериализатор для отображения рецептов."""
 
@@ -195,6 +291,7 @@ class RecipeReadSerializer(serializers.ModelSerializer):
     )
     tags = TagSerializer(many=True, read_only=True)
     image = Base64ImageField(use_url=True)
+    image_variants = ImageVariantsField()
     is_favorited = serializers.BooleanField(
         default=False,
         read_only=True,
@@ -211,14 +308,91 @@ class RecipeReadSerializer(serializers.ModelSerializer):
         model = Recipe
         fields = (
             'id', 'name', 'text', 'cooking_time',
-            'ingredients', 'tags', 'image', 'author',
+            'ingredients', 'tags', 'image', 'image_variants', 'author',
             'is_favorited', 'is_in_shopping_cart',
         )
+        list_serializer_class = RecipeReadListSerializer
+
+    def to_representation(self, instance):
+        """Представление рецепта из кеша с полями текущего пользователя.
 
+        Кешируется часть, не зависящая от пользователя; is_favorited,
+        is_in_shopping_cart и author.is_subscribed добавляются к ней
+        при каждом ответе.
+        """
+        fragment = self.get_fragments([instance])[instance.pk]
+        return self.merge_viewer_fields(instance, fragment)
 
-class RecipeShortSerializer(serializers.ModelSerializer):
+    def get_fragments(self, recipes):
+        request = self.context.get('request')
+        prefix = request.build_absolute_uri('/') if request else ''
+        return get_recipe_fragments(recipes, self.build_fragment, prefix)
+
+    def build_fragment(self, instance):
+        if settings.FAST_SERIALIZERS:
+            return self.fast_fragment(instance)
+        data = super().to_representation(instance)
+        for field in RECIPE_USER_LISTS:
+            data.pop(field)
+        data['author'].pop('is_subscribed')
+        return data
+
+    def fast_fragment(self, instance):
+        """Фрагмент рецепта, собранный напрямую из загруженных объектов."""
+        author = instance.author
+        return {
+            'id': instance.id,
+            'name': instance.name,
+            'text': instance.text,
+            'cooking_time': instance.cooking_time,
+            'ingredients': [
+                {
+                    'id': item.ingredient.id,
+                    'name': item.ingredient.name,
+                    'measurement_unit': item.ingredient.measurement_unit,
+                    'amount': item.amount,
+                }
+                for item in instance.ingredient_list.all()
+            ],
+            'tags': [
+                {'id': tag.id, 'name': tag.name, 'slug': tag.slug}
+                for tag in instance.tags.all()
+            ],
+            'image': image_url(instance.image, self.context.get('request')),
+            'image_variants': variant_urls(
+                instance.image_variants, self.context.get('request')
+            ),
+            'author': {
+                'id': author.id,
+                'email': author.email,
+                'username': author.username,
+                'first_name': author.first_name,
+                'last_name': author.last_name,
+                'avatar': image_url(author.avatar),
+                'avatar_variants': variant_urls(author.avatar_variants),
+            },
+        }
+
+    def merge_viewer_fields(self, instance, fragment):
+        data = dict(fragment)
+        data['author'] = dict(
+            fragment['author'],
+            is_subscribed=resolve_is_subscribed(self.context, instance.author)
+        )
+        for field, model in RECIPE_USER_LISTS.items():
+            data[field] = instance.pk in resolve_user_recipe_ids(
+                self.context, model
+            )
+        return data
+
+
+class RecipeShortSerializer(
+    FastRepresentationMixin,
+    serializers.ModelSerializer
+):
     """Краткий сериализатор для рецептов (используется в подписках)."""
     image = Base64ImageField()
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Recipe
@@ -226,9 +400,21 @@ class RecipeShortSerializer(serializers.ModelSerializer):
             'id',
             'name',
             'image',
+            'image_variants',
             'cooking_time'
         )
 
+    def fast_representation(self, instance):
+        return {
+            'id': instance.id,
+            'name': instance.name,
+            'image': image_url(instance.image, self.context.get('request')),
+            'image_variants': variant_urls(
+                instance.image_variants, self.context.get('request')
+            ),
+            'cooking_time': instance.cooking_time,
+        }
+
 
 class SubscriptionSerializer(UserSerializer):
     """Сериализатор для подписок с рецептами авторов."""
@@ -240,16 +426,22 @@ class SubscriptionSerializer(UserSerializer):
         fields = UserSerializer.Meta.fields + ('recipes', 'recipes_count')
 
     def get_recipes(self, obj):
-        request = self.context.get('request')
-        limit = request.query_params.get('recipes_limit')
-        recipes = obj.recipes.all()
-        if limit and limit.isdigit():
-            recipes = recipes[:int(limit)]
+        """Рецепты автора с учетом recipes_limit.
+
+        В списке подписок рецепты уже отобраны в БД через Prefetch
+        в атрибут short_recipes.
+        """
+        recipes = getattr(obj, 'short_recipes', None)
+        if recipes is None:
+            recipes = obj.recipes.all()
+            limit = get_recipes_limit(self.context.get('request'))
+            if limit is not None:
+                recipes = recipes[:limit]
         return RecipeShortSerializer(recipes, many=True).data
 
     def get_recipes_count(self, obj):
-        """Количество рецептов автора."""
-        return obj.recipes.count()
+        """Количество рецептов автора из счетчика User.recipes_count."""
+        return obj.recipes_count
 
 
 class AvatarSerializer(serializers.ModelSerializer):
@@ -258,3 +450,13 @@ class AvatarSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('avatar',)
+
+
+class BulkIdsSerializer(serializers.Serializer):
+    """Список id для пакетных операций."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=BULK_IDS_LIMIT,
+    )
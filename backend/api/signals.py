@@ -0,0 +1,112 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from api.cache import (
+    INGREDIENTS_VERSION_KEY,
+    TAGS_VERSION_KEY,
+    bump_recipe_shopping_carts,
+    bump_version,
+    forget_short_links,
+    recipe_version_key,
+    user_version_key,
+)
+from api.images import schedule_image_processing
+from recipes.models import (
+    Ingredient,
+    IngredientInRecipe,
+    Recipe,
+    ShortLinkAlias,
+    Tag,
+)
+
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_ingredients(**kwargs):
+    """Сброс индекса и кеша ингредиентов при изменении справочника."""
+    bump_version(INGREDIENTS_VERSION_KEY)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tags(**kwargs):
+    """Сброс кеша тегов при изменении справочника."""
+    bump_version(TAGS_VERSION_KEY)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_recipe(instance, **kwargs):
+    """Сброс кешированного представления рецепта."""
+    bump_version(recipe_version_key(instance.pk))
+
+
+@receiver(pre_delete, sender=Recipe)
+def invalidate_recipe_shopping_carts(instance, **kwargs):
+    """Сброс версии корзин, в которых лежит удаляемый рецепт.
+
+    Срабатывает при любом удалении: через API, админку или каскадом
+    вместе с автором, пока строки корзин еще не удалены.
+    """
+    bump_recipe_shopping_carts(instance)
+
+
+@receiver(post_save, sender=Recipe)
+def invalidate_new_short_link(instance, created, **kwargs):
+    """Сброс короткой ссылки нового рецепта.
+
+    В кеше может лежать отметка, что такой ссылки нет.
+    """
+    if created:
+        forget_short_links(instance.slug)
+
+
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=ShortLinkAlias)
+def invalidate_deleted_short_link(instance, **kwargs):
+    """Сброс короткой ссылки удаленного рецепта или прежней ссылки."""
+    forget_short_links(instance.slug)
+
+
+@receiver(post_save, sender=Recipe)
+def count_author_recipe(instance, created, **kwargs):
+    """Увеличение счетчика рецептов автора при создании рецепта."""
+    if created:
+        User.objects.filter(pk=instance.author_id).update(
+            recipes_count=F('recipes_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Recipe)
+def uncount_author_recipe(instance, **kwargs):
+    """Уменьшение счетчика рецептов автора при удалении рецепта."""
+    User.objects.filter(
+        pk=instance.author_id, recipes_count__gt=0
+    ).update(recipes_count=F('recipes_count') - 1)
+
+
+@receiver(post_save, sender=IngredientInRecipe)
+@receiver(post_delete, sender=IngredientInRecipe)
+def invalidate_recipe_ingredients(instance, **kwargs):
+    """Сброс представления рецепта при правке его ингредиентов."""
+    bump_version(recipe_version_key(instance.recipe_id))
+
+
+@receiver(post_save, sender=User)
+def invalidate_author(instance, update_fields=None, **kwargs):
+    """Сброс представлений рецептов автора при изменении профиля."""
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    bump_version(user_version_key(instance.pk))
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=User)
+def build_image_variants(instance, update_fields=None, **kwargs):
+    """Построение вариантов нового изображения рецепта или аватара."""
+    schedule_image_processing(instance, update_fields)
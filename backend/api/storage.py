@@ -0,0 +1,44 @@
+import hashlib
+import os
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранилище, называющее файлы по SHA-256 содержимого.
+
+    Файл сохраняется как <каталог>/<2 символа хеша>/<хеш><расширение>,
+    каталог берется из upload_to. Повторная загрузка того же содержимого
+    не пишет файл заново, а возвращает уже существующее имя. Один файл
+    может принадлежать нескольким объектам, поэтому файлы не удаляются
+    вместе с объектами: неиспользуемые удаляет команда cleanmedia.
+    При повторной загрузке у файла обновляется время изменения.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        if self.exists(name):
+            try:
+                # Файл мог быть без ссылок: свежее время изменения
+                # защищает его от cleanmedia на время grace-периода.
+                os.utime(self.path(name))
+                return name
+            except FileNotFoundError:
+                pass
+        return super().save(name, content, max_length=max_length)
+
+    @staticmethod
+    def hashed_name(name, content):
+        sha256 = hashlib.sha256()
+        for chunk in content.chunks():
+            sha256.update(chunk)
+        content.seek(0)
+        digest = sha256.hexdigest()
+        directory = os.path.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        return os.path.join(directory, digest[:2], f'{digest}{extension}')
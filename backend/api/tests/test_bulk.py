@@ -0,0 +1,172 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.constants import BULK_IDS_LIMIT
+from api.tests.utils import create_catalog, create_recipe, create_user
+from recipes.models import Favorite, ShoppingCart
+from users.models import Subscription
+
+
+USER_LISTS = {
+    '/api/recipes/favorite/': Favorite,
+    '/api/recipes/shopping_cart/': ShoppingCart,
+}
+SUBSCRIBE_URL = '/api/users/subscribe/'
+
+
+class BulkTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('user')
+        cls.other = create_user('other')
+        cls.authors = [create_user(f'author{index}') for index in range(2)]
+        tags, ingredients = create_catalog()
+        cls.recipes = [
+            create_recipe(author, tags, ingredients)
+            for author in cls.authors
+        ]
+        cls.missing = cls.recipes[-1].pk + cls.authors[-1].pk + 100
+
+    def setUp(self):
+        cache.clear()
+        self.client = self.client_for(self.user)
+
+    @staticmethod
+    def client_for(user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def bulk(self, method, url, ids, client=None):
+        response = getattr(client or self.client, method)(
+            url, {'ids': ids}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        for result in results:
+            self.assertLessEqual(set(result), {'id', 'status', 'data'})
+        return results
+
+    def assert_statuses(self, results, expected):
+        self.assertEqual(
+            [(result['id'], result['status']) for result in results],
+            expected
+        )
+
+
+class UserListBulkTest(BulkTestCase):
+    """Пакетное добавление и удаление в избранном и списке покупок."""
+
+    def test_add(self):
+        first, second = self.recipes
+        for url, model in USER_LISTS.items():
+            with self.subTest(url=url):
+                model.objects.create(user=self.user, recipe=first)
+                results = self.bulk(
+                    'post', url,
+                    [first.pk, second.pk, self.missing, second.pk]
+                )
+                self.assert_statuses(results, [
+                    (first.pk, 400), (second.pk, 201), (self.missing, 404),
+                ])
+                self.assertIn('errors', results[0]['data'])
+                self.assertIn('detail', results[2]['data'])
+                single = self.client_for(self.other).post(
+                    f'/api/recipes/{second.pk}/{url.split("/")[-2]}/'
+                )
+                self.assertEqual(results[1]['data'], single.json())
+                self.assertEqual(
+                    model.objects.filter(user=self.user).count(), 2
+                )
+
+    def test_remove(self):
+        first, second = self.recipes
+        for url, model in USER_LISTS.items():
+            with self.subTest(url=url):
+                model.objects.create(user=self.user, recipe=first)
+                results = self.bulk(
+                    'delete', url, [first.pk, second.pk, self.missing]
+                )
+                self.assert_statuses(results, [
+                    (first.pk, 204), (second.pk, 400), (self.missing, 404),
+                ])
+                self.assertNotIn('data', results[0])
+                self.assertIn('errors', results[1]['data'])
+                self.assertFalse(model.objects.filter(user=self.user))
+
+    def test_invalid_ids(self):
+        for url in USER_LISTS:
+            for ids in (
+                [], ['a'], [0], list(range(1, BULK_IDS_LIMIT + 2)), None
+            ):
+                with self.subTest(url=url, ids=ids):
+                    response = self.client.post(
+                        url, {'ids': ids}, format='json'
+                    )
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn('ids', response.json())
+
+    def test_anonymous(self):
+        for url in USER_LISTS:
+            with self.subTest(url=url):
+                response = APIClient().post(
+                    url, {'ids': [self.recipes[0].pk]}, format='json'
+                )
+                self.assertEqual(response.status_code, 401)
+
+
+class SubscribeBulkTest(BulkTestCase):
+    """Пакетная подписка и отписка."""
+
+    def test_subscribe(self):
+        first, second = self.authors
+        Subscription.objects.create(user=self.user, author=first)
+        results = self.bulk('post', SUBSCRIBE_URL, [
+            self.user.pk, first.pk, second.pk, self.missing, second.pk,
+        ])
+        self.assert_statuses(results, [
+            (self.user.pk, 400), (first.pk, 400), (second.pk, 201),
+            (self.missing, 404),
+        ])
+        self.assertEqual(
+            results[0]['data'], {'error': 'Нельзя подписаться на себя'}
+        )
+        self.assertEqual(results[1]['data'], {'error': 'Вы уже подписаны'})
+        self.assertEqual(
+            results[3]['data'], {'error': 'Пользователь не найден'}
+        )
+        single = self.client_for(self.other).post(
+            f'/api/users/{second.pk}/subscribe/'
+        )
+        self.assertEqual(results[2]['data'], single.json())
+        self.assertTrue(results[2]['data']['is_subscribed'])
+        self.assertEqual(
+            set(Subscription.objects.filter(user=self.user).values_list(
+                'author_id', flat=True
+            )),
+            {first.pk, second.pk}
+        )
+
+    def test_unsubscribe(self):
+        first, second = self.authors
+        Subscription.objects.create(user=self.user, author=first)
+        results = self.bulk('delete', SUBSCRIBE_URL, [
+            first.pk, second.pk, self.user.pk, self.missing,
+        ])
+        self.assert_statuses(results, [
+            (first.pk, 204), (second.pk, 400), (self.user.pk, 400),
+            (self.missing, 404),
+        ])
+        self.assertNotIn('data', results[0])
+        self.assertEqual(results[1]['data'], {'error': 'Подписка не найдена'})
+        self.assertFalse(Subscription.objects.filter(user=self.user))
+
+    def test_invalid_ids(self):
+        for method in ('post', 'delete'):
+            with self.subTest(method=method):
+                response = getattr(self.client, method)(
+                    SUBSCRIBE_URL, {'ids': []}, format='json'
+                )
+                self.assertEqual(response.status_code, 400)
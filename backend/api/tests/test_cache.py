@@ -0,0 +1,41 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from api.cache import get_version, get_version_timeout, get_versions
+from api.constants import VERSION_CACHE_TIMEOUT
+
+
+class VersionTest(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_local_cache_timeout(self):
+        self.assertEqual(get_version_timeout(), VERSION_CACHE_TIMEOUT)
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': '/tmp/foodgram-test-cache',
+    }})
+    def test_shared_cache_no_timeout(self):
+        self.assertIsNone(get_version_timeout())
+
+    def test_version_is_stable(self):
+        self.assertEqual(get_version('a'), get_version('a'))
+        self.assertEqual(get_versions(['a', 'b']), get_versions(['a', 'b']))
+        self.assertEqual(get_versions(['a'])['a'], get_version('a'))
+
+    def test_concurrent_miss_keeps_first_version(self):
+        # Другой процесс успел записать версию между get_many и add.
+        original_add = cache.add
+
+        def add(key, value, timeout):
+            original_add(key, 'first', timeout)
+            return original_add(key, value, timeout)
+
+        with mock.patch.object(cache, 'add', side_effect=add):
+            versions = get_versions(['a', 'b'])
+        self.assertEqual(versions, {'a': 'first', 'b': 'first'})
+        self.assertEqual(get_version('a'), 'first')
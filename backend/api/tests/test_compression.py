@@ -0,0 +1,113 @@
+import gzip
+import os
+from unittest import skipIf
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from api.compression import brotli
+from api.middleware import CompressionMiddleware
+
+
+CONTENT = b'{"name": "\xd0\xa1\xd0\xbe\xd0\xbb\xd1\x8c"}' * 200
+
+
+@override_settings(COMPRESSION_MIN_SIZE=1024)
+class CompressionMiddlewareTest(SimpleTestCase):
+    """Выбор сжатия по Accept-Encoding и ответы, которые не сжимаются."""
+
+    def process(self, response, accept_encoding='gzip, deflate, br'):
+        request = RequestFactory().get(
+            '/', HTTP_ACCEPT_ENCODING=accept_encoding
+        )
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def json_response(self, content=CONTENT, **headers):
+        response = HttpResponse(content, content_type='application/json')
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    @skipIf(brotli is None, 'brotli не установлен')
+    def test_brotli_preferred(self):
+        response = self.process(self.json_response())
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), CONTENT)
+        self.assertEqual(
+            response['Content-Length'], str(len(response.content))
+        )
+
+    def test_gzip(self):
+        response = self.process(self.json_response(), 'gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), CONTENT)
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_not_accepted(self):
+        for accept_encoding in ('', 'identity', 'deflate', 'gzipped'):
+            with self.subTest(accept_encoding=accept_encoding):
+                response = self.process(self.json_response(), accept_encoding)
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertEqual(response.content, CONTENT)
+                self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_vary_appended(self):
+        response = self.process(self.json_response(Vary='Cookie'))
+        self.assertEqual(response['Vary'], 'Cookie, Accept-Encoding')
+
+    def test_etag_weakened(self):
+        response = self.process(self.json_response(ETag='"abc"'), 'gzip')
+        self.assertEqual(response['ETag'], 'W/"abc"')
+
+    def test_already_encoded(self):
+        response = self.process(self.json_response(
+            CONTENT, **{'Content-Encoding': 'gzip'}
+        ))
+        self.assertEqual(response.content, CONTENT)
+        self.assertFalse(response.has_header('Vary'))
+
+    def test_skipped(self):
+        responses = {
+            'no-transform': self.json_response(
+                **{'Cache-Control': 'no-transform'}
+            ),
+            'тип содержимого': HttpResponse(
+                CONTENT, content_type='image/png'
+            ),
+            'короткий ответ': self.json_response(CONTENT[:1023]),
+        }
+        for name, response in responses.items():
+            with self.subTest(name):
+                content = response.content
+                response = self.process(response)
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertEqual(response.content, content)
+
+    def test_incompressible(self):
+        content = os.urandom(2048)
+        response = self.process(self.json_response(content), 'gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, content)
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_streaming_gzip_only(self):
+        response = StreamingHttpResponse(
+            iter([CONTENT, CONTENT]), content_type='text/plain'
+        )
+        response['Content-Length'] = str(len(CONTENT) * 2)
+        response = self.process(response)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        self.assertEqual(
+            gzip.decompress(b''.join(response.streaming_content)),
+            CONTENT * 2
+        )
+
+    def test_streaming_without_gzip(self):
+        response = self.process(
+            StreamingHttpResponse(iter([CONTENT]), content_type='text/plain'),
+            'br'
+        )
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
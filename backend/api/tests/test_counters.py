@@ -0,0 +1,141 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.tests.utils import create_catalog, create_recipe, create_user
+from recipes.models import Favorite, Recipe, ShoppingCart
+from users.models import User
+
+
+USER_LISTS = {
+    'favorite': 'favorite_count',
+    'shopping_cart': 'shopping_cart_count',
+}
+
+
+class CountersTest(TestCase):
+    """Счетчики рецептов при изменении списков и удалении рецептов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('user')
+        cls.author = create_user('author')
+        cls.tags, cls.ingredients = create_catalog()
+        cls.recipes = [
+            create_recipe(cls.author, cls.tags, cls.ingredients)
+            for _ in range(2)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def counter(self, field, recipe=None):
+        return Recipe.objects.values_list(field, flat=True).get(
+            pk=(recipe or self.recipes[0]).pk
+        )
+
+    def test_add_and_remove(self):
+        url = f'/api/recipes/{self.recipes[0].pk}'
+        for name, field in USER_LISTS.items():
+            with self.subTest(name=name):
+                for method, status_code, count in (
+                    ('post', 201, 1), ('post', 400, 1),
+                    ('delete', 204, 0), ('delete', 400, 0),
+                ):
+                    response = getattr(self.client, method)(
+                        f'{url}/{name}/'
+                    )
+                    self.assertEqual(response.status_code, status_code)
+                    self.assertEqual(self.counter(field), count)
+
+    def test_bulk_add_and_remove(self):
+        ids = [recipe.pk for recipe in self.recipes]
+        for name, field in USER_LISTS.items():
+            with self.subTest(name=name):
+                url = f'/api/recipes/{name}/'
+                for method, count in (
+                    ('post', 1), ('post', 1), ('delete', 0), ('delete', 0),
+                ):
+                    getattr(self.client, method)(
+                        url, {'ids': ids}, format='json'
+                    )
+                    for recipe in self.recipes:
+                        self.assertEqual(self.counter(field, recipe), count)
+
+    def test_recipe_delete(self):
+        Favorite.objects.create(user=self.user, recipe=self.recipes[1])
+        Recipe.objects.filter(pk=self.recipes[1].pk).update(favorite_count=1)
+        self.assertEqual(
+            User.objects.get(pk=self.author.pk).recipes_count, 2
+        )
+        client = APIClient()
+        client.force_authenticate(self.author)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.delete(f'/api/recipes/{self.recipes[0].pk}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(
+            User.objects.get(pk=self.author.pk).recipes_count, 1
+        )
+        self.assertEqual(self.counter('favorite_count', self.recipes[1]), 1)
+        self.assertEqual(
+            self.client.get(
+                f'/api/recipes/{self.recipes[1].pk}/'
+            ).json()['is_favorited'],
+            True
+        )
+
+
+class ReconcileCountersTest(TestCase):
+    """Команда reconcilecounters исправляет расхождения счетчиков."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user('author')
+        cls.users = [create_user(f'user{index}') for index in range(3)]
+        tags, ingredients = create_catalog()
+        cls.recipes = [
+            create_recipe(cls.author, tags, ingredients) for _ in range(3)
+        ]
+        for user in cls.users:
+            for recipe in cls.recipes[:2]:
+                Favorite.objects.create(user=user, recipe=recipe)
+            ShoppingCart.objects.create(user=user, recipe=cls.recipes[0])
+
+    def reconcile(self, *args):
+        stdout = StringIO()
+        call_command('reconcilecounters', *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_reconcile(self):
+        # Счетчики не обновлялись при создании записей напрямую,
+        # удаление пользователя каскадом тоже их не меняет.
+        Recipe.objects.filter(pk=self.recipes[2].pk).update(
+            favorite_count=5, shopping_cart_count=2
+        )
+        self.users[0].delete()
+        User.objects.filter(pk=self.author.pk).update(recipes_count=0)
+
+        output = self.reconcile('--batch-size', '1')
+
+        self.assertIn('Recipe.favorite_count: исправлено 3', output)
+        self.assertIn('Recipe.shopping_cart_count: исправлено 2', output)
+        self.assertIn('User.recipes_count: исправлено 1', output)
+        self.assertEqual(
+            list(Recipe.objects.order_by('pk').values_list(
+                'favorite_count', 'shopping_cart_count'
+            )),
+            [(2, 2), (2, 0), (0, 0)]
+        )
+        self.assertEqual(
+            User.objects.get(pk=self.author.pk).recipes_count, 3
+        )
+
+    def test_nothing_to_fix(self):
+        self.reconcile()
+        output = self.reconcile()
+        self.assertEqual(output.count('исправлено 0'), 3)
@@ -0,0 +1,79 @@
+import base64
+import io
+from unittest import mock
+
+from PIL import Image
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ValidationError
+
+from api.constants import BASE64_CHUNK_SIZE
+from api.fields import Base64ImageField
+
+
+def png_bytes():
+    buffer = io.BytesIO()
+    Image.new('RGB', (40, 40), 'red').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class Base64ImageFieldTest(SimpleTestCase):
+
+    def decode(self, encoded):
+        return Base64ImageField().to_internal_value(
+            f'data:image/png;base64,{encoded}'
+        )
+
+    def test_plain(self):
+        file = self.decode(base64.b64encode(png_bytes()).decode())
+        self.assertEqual(file.read(), png_bytes())
+
+    def test_line_wrapped(self):
+        file = self.decode(base64.encodebytes(png_bytes()).decode())
+        self.assertEqual(file.read(), png_bytes())
+        self.assertEqual(file.size, len(png_bytes()))
+
+    def test_invalid(self):
+        encoded = base64.b64encode(png_bytes()).decode()
+        with self.assertRaises(ValidationError):
+            self.decode(f'{encoded[:-4]}!!!!')
+
+
+def jpeg_bytes(image_format='JPEG', **options):
+    buffer = io.BytesIO()
+    Image.new('RGB', (40, 40), 'red').save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+class Base64ImageHeaderTest(SimpleTestCase):
+
+    def decode(self, data, mime='jpeg'):
+        return Base64ImageField().to_internal_value(
+            f'data:image/{mime};base64,{base64.b64encode(data).decode()}'
+        )
+
+    def test_mpo_is_jpeg(self):
+        data = jpeg_bytes(
+            'MPO', save_all=True,
+            append_images=[Image.new('RGB', (40, 40), 'blue')]
+        )
+        with Image.open(io.BytesIO(data)) as image:
+            self.assertEqual(image.format, 'MPO')
+        self.assertEqual(self.decode(data).read(), data)
+
+    def test_header_beyond_first_chunk(self):
+        data = jpeg_bytes(icc_profile=bytes(BASE64_CHUNK_SIZE * 2))
+        self.assertEqual(self.decode(data).read(), data)
+
+    def test_junk_rejected_on_first_chunk(self):
+        data = bytes(range(256)) * (BASE64_CHUNK_SIZE // 64)
+        with mock.patch(
+            'api.fields.base64.b64decode', wraps=base64.b64decode
+        ) as b64decode:
+            with self.assertRaises(ValidationError):
+                self.decode(data)
+        self.assertEqual(b64decode.call_count, 1)
+
+    def test_disallowed_format_rejected(self):
+        with self.assertRaises(ValidationError) as context:
+            self.decode(jpeg_bytes('BMP'), 'bmp')
+        self.assertIn('Допустимые форматы', str(context.exception))
@@ -0,0 +1,64 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.db import transaction
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api.tests.test_recipe_views import image_data
+from api.tests.utils import create_catalog, create_user
+from recipes.models import Recipe
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_WORKERS=0)
+@mock.patch('api.images._executor', None)
+class InlineImageProcessingTest(TestCase):
+    """Обработка изображения без пула не ломает сохранение рецепта."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user('author')
+        cls.tags, cls.ingredients = create_catalog()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def create_recipe(self):
+        return self.client.post('/api/recipes/', {
+            'name': 'Рецепт',
+            'text': 'Описание',
+            'cooking_time': 5,
+            'image': image_data(),
+            'tags': [self.tags[0].pk],
+            'ingredients': [{'id': self.ingredients[0].pk, 'amount': 1}],
+        }, format='json')
+
+    def test_variants_built_inline(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.create_recipe()
+        self.assertEqual(response.status_code, 201)
+        recipe = Recipe.objects.get(pk=response.json()['id'])
+        self.assertEqual(recipe.image_variants['source'], recipe.image.name)
+
+    def test_failed_processing_is_logged(self):
+        later_hook = mock.Mock()
+        with mock.patch(
+            'api.images.render_variants', side_effect=OSError('broken')
+        ), self.assertLogs('api.images', 'ERROR'):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.create_recipe()
+                transaction.on_commit(later_hook)
+        self.assertEqual(response.status_code, 201)
+        later_hook.assert_called_once()
+        recipe = Recipe.objects.get(pk=response.json()['id'])
+        self.assertEqual(recipe.image_variants, {})
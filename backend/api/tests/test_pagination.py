@@ -0,0 +1,103 @@
+from unittest import mock, skipIf, skipUnless
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.constants import APPROXIMATE_COUNT_THRESHOLD
+from api.pagination import CachedCountPaginator, estimate_count
+from api.tests.utils import create_catalog, create_recipe, create_user
+from recipes.models import Recipe
+
+
+POSTGRESQL = connection.vendor == 'postgresql'
+
+
+class CachedCountPaginatorTest(TestCase):
+    """Выбор между оценкой планировщика и точным кешируемым COUNT."""
+
+    @classmethod
+    def setUpTestData(cls):
+        tags, ingredients = create_catalog()
+        author = create_user('author')
+        cls.recipes = [
+            create_recipe(author, tags, ingredients) for _ in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def paginator(self, queryset=None):
+        if queryset is None:
+            queryset = Recipe.objects.order_by('id')
+        return CachedCountPaginator(queryset, 2)
+
+    def estimate(self, value):
+        return mock.patch(
+            'api.pagination.estimate_count', return_value=value
+        )
+
+    def test_estimate_for_large_table(self):
+        with self.estimate(APPROXIMATE_COUNT_THRESHOLD):
+            paginator = self.paginator()
+            with self.assertNumQueries(0):
+                self.assertEqual(paginator.count, APPROXIMATE_COUNT_THRESHOLD)
+        self.assertTrue(paginator.approximate)
+
+    def test_exact_for_small_table(self):
+        with self.estimate(APPROXIMATE_COUNT_THRESHOLD - 1):
+            paginator = self.paginator()
+            self.assertEqual(paginator.count, 3)
+        self.assertFalse(paginator.approximate)
+
+    def test_exact_for_filtered_queryset(self):
+        with self.estimate(APPROXIMATE_COUNT_THRESHOLD) as estimate:
+            paginator = self.paginator(
+                Recipe.objects.filter(pk__gt=self.recipes[0].pk)
+            )
+            self.assertEqual(paginator.count, 2)
+        estimate.assert_not_called()
+        self.assertFalse(paginator.approximate)
+
+    @skipIf(POSTGRESQL, 'Оценка доступна в PostgreSQL')
+    def test_no_estimate_fallback(self):
+        self.assertIsNone(estimate_count(Recipe))
+        paginator = self.paginator()
+        self.assertEqual(paginator.count, 3)
+        self.assertFalse(paginator.approximate)
+
+    @skipUnless(POSTGRESQL, 'pg_class есть только в PostgreSQL')
+    def test_postgresql_estimate(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Recipe._meta.db_table}')
+        self.assertEqual(estimate_count(Recipe), 3)
+
+    def test_exact_count_cached(self):
+        with self.estimate(None):
+            with self.assertNumQueries(1):
+                self.assertEqual(self.paginator().count, 3)
+            Recipe.objects.filter(pk=self.recipes[0].pk).delete()
+            with self.assertNumQueries(0):
+                self.assertEqual(self.paginator().count, 3)
+            with self.assertNumQueries(1):
+                self.assertEqual(self.paginator(
+                    Recipe.objects.filter(pk__gt=0)
+                ).count, 2)
+
+    def test_empty_result(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.paginator(Recipe.objects.filter(pk__in=[])).count, 0
+            )
+
+    def test_approximate_flag_in_response(self):
+        client = APIClient()
+        with self.estimate(APPROXIMATE_COUNT_THRESHOLD):
+            data = client.get('/api/recipes/').json()
+        self.assertEqual(data['count'], APPROXIMATE_COUNT_THRESHOLD)
+        self.assertIs(data['count_is_approximate'], True)
+        with self.estimate(None):
+            data = client.get('/api/recipes/').json()
+        self.assertEqual(data['count'], 3)
+        self.assertNotIn('count_is_approximate', data)
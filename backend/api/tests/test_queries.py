@@ -0,0 +1,73 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.tests.utils import create_catalog, create_recipe, create_user
+from recipes.models import Favorite, ShoppingCart
+from users.models import Subscription
+
+
+PAGE_SIZES = (1, 6, 50)
+
+# На Postgres для списка без фильтров число строк оценивается
+# отдельным запросом к pg_class.
+ESTIMATE_QUERIES = int(connection.vendor == 'postgresql')
+
+
+class ListQueriesTest(TestCase):
+    """Число запросов списков не зависит от размера страницы."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.viewer = create_user('viewer')
+        tags, ingredients = create_catalog()
+        authors = [create_user(f'author{index}') for index in range(60)]
+        for author in authors[::2]:
+            Subscription.objects.create(user=cls.viewer, author=author)
+        for index, author in enumerate(authors):
+            recipe = create_recipe(
+                author, tags, ingredients, name=f'Рецепт {index}'
+            )
+            if index % 3 == 0:
+                Favorite.objects.create(user=cls.viewer, recipe=recipe)
+                ShoppingCart.objects.create(user=cls.viewer, recipe=recipe)
+            create_recipe(author, tags, ingredients, name=f'Второй {index}')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+
+    def assert_constant_queries(self, url, queries, params=None):
+        for limit in PAGE_SIZES:
+            with self.subTest(url=url, limit=limit):
+                cache.clear()
+                with self.assertNumQueries(queries):
+                    response = self.client.get(
+                        url, {'limit': limit, **(params or {})}
+                    )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    len(response.json()['results']),
+                    min(limit, response.json()['count'])
+                )
+
+    def test_recipe_list(self):
+        self.assert_constant_queries('/api/recipes/', 8 + ESTIMATE_QUERIES)
+
+    def test_recipe_list_anonymous(self):
+        self.client.force_authenticate(None)
+        self.assert_constant_queries('/api/recipes/', 5 + ESTIMATE_QUERIES)
+
+    def test_recipe_list_filtered(self):
+        self.assert_constant_queries(
+            '/api/recipes/', 8, {'is_favorited': 1, 'tags': 'tag0'}
+        )
+
+    def test_user_list(self):
+        self.assert_constant_queries('/api/users/', 2 + ESTIMATE_QUERIES)
+
+    def test_subscription_list(self):
+        self.assert_constant_queries(
+            '/api/users/subscriptions/', 3, {'recipes_limit': 1}
+        )
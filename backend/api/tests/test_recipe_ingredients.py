@@ -0,0 +1,83 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from api.tests.utils import create_catalog, create_recipe, create_user
+from api.utils import processing_recipe_ingredients_and_tags
+from recipes.models import IngredientInRecipe
+
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE')
+
+
+class RecipeIngredientsUpdateTest(TestCase):
+    """Обновление ингредиентов рецепта меняет только отличающиеся строки."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tags, cls.ingredients = create_catalog(ingredients=4)
+        cls.recipe = create_recipe(
+            create_user('author'), cls.tags, cls.ingredients[:3]
+        )
+
+    def rows(self):
+        return dict(IngredientInRecipe.objects.filter(
+            recipe=self.recipe
+        ).values_list('ingredient_id', 'id'))
+
+    def update(self, amounts):
+        """Обновление с подсчетом всех и пишущих запросов."""
+        with CaptureQueriesContext(connection) as context:
+            processing_recipe_ingredients_and_tags(
+                self.recipe,
+                [
+                    {'ingredient': ingredient, 'amount': amount}
+                    for ingredient, amount in amounts
+                ],
+                self.tags
+            )
+        writes = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].lstrip().upper().startswith(WRITE_STATEMENTS)
+        ]
+        return len(context), writes
+
+    def test_unchanged_resubmit(self):
+        before = self.rows()
+        queries, writes = self.update(
+            (ingredient, 10) for ingredient in self.ingredients[:3]
+        )
+        self.assertEqual(queries, 2)
+        self.assertEqual(writes, [])
+        self.assertEqual(self.rows(), before)
+
+    def test_single_amount_change(self):
+        before = self.rows()
+        first, *rest = self.ingredients[:3]
+        queries, writes = self.update(
+            [(first, 20)] + [(ingredient, 10) for ingredient in rest]
+        )
+        self.assertEqual(queries, 4)
+        self.assertEqual(len(writes), 1)
+        self.assertTrue(writes[0].startswith('UPDATE'))
+        self.assertEqual(self.rows(), before)
+        self.assertEqual(
+            IngredientInRecipe.objects.get(pk=before[first.pk]).amount, 20
+        )
+
+    def test_replace_one_ingredient(self):
+        before = self.rows()
+        removed, *kept = self.ingredients[:3]
+        added = self.ingredients[3]
+        queries, writes = self.update(
+            [(ingredient, 10) for ingredient in kept] + [(added, 5)]
+        )
+        self.assertEqual(queries, 6)
+        self.assertEqual(
+            sorted(sql.split()[0] for sql in writes), ['DELETE', 'INSERT']
+        )
+        after = self.rows()
+        self.assertNotIn(removed.pk, after)
+        self.assertIn(added.pk, after)
+        for ingredient in kept:
+            self.assertEqual(after[ingredient.pk], before[ingredient.pk])
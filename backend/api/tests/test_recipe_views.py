@@ -0,0 +1,216 @@
+import base64
+import io
+import shutil
+import tempfile
+
+from PIL import Image
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.tests.utils import create_catalog, create_recipe, create_user
+from recipes.models import Recipe
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+# Колонки пользователя, которые не нужны UserSerializer.
+USER_EXCLUDED_COLUMNS = (
+    'password', 'last_login', 'is_superuser', 'is_staff', 'is_active',
+    'date_joined',
+)
+
+
+def image_data():
+    buffer = io.BytesIO()
+    Image.new('RGB', (10, 10), 'red').save(buffer, 'PNG')
+    encoded = base64.b64encode(buffer.getvalue()).decode()
+    return f'data:image/png;base64,{encoded}'
+
+
+def fetched_bytes(sql):
+    """Объем данных, который возвращает запрос: сумма длин значений.
+
+    Запрос выполняется повторно по тексту из CaptureQueriesContext.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+        rows = cursor.fetchall()
+    return sum(
+        len(value if isinstance(value, bytes) else str(value).encode())
+        for row in rows for value in row if value is not None
+    )
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class RecipeViewQueriesTest(TestCase):
+    """Число запросов и объем загружаемых данных по действиям."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tags, cls.ingredients = create_catalog(ingredients=5)
+        cls.author = create_user('author')
+        cls.recipes = [
+            create_recipe(
+                create_user(f'other{index}'), cls.tags, cls.ingredients,
+                name=f'Рецепт {index}'
+            )
+            for index in range(10)
+        ]
+        cls.recipe = create_recipe(cls.author, cls.tags, cls.ingredients)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def recipe_selects(self, context):
+        return [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "recipes_recipe"' in query['sql']
+            and 'COUNT(' not in query['sql']
+        ]
+
+    def test_list(self):
+        with CaptureQueriesContext(connection) as context:
+            with self.assertNumQueries(8):
+                response = self.client.get('/api/recipes/', {'limit': 10})
+        self.assertEqual(response.status_code, 200)
+        sql, = self.recipe_selects(context)
+        for column in USER_EXCLUDED_COLUMNS:
+            self.assertNotIn(f'"users_user"."{column}"', sql)
+        self.assertNotIn('"recipes_recipe"."slug"', sql)
+        full_sql = str(Recipe.objects.select_related('author').filter(
+            pk__in=[recipe['id'] for recipe in response.json()['results']]
+        ).query)
+        self.assertLess(fetched_bytes(sql), fetched_bytes(full_sql) * 0.7)
+
+    def test_retrieve(self):
+        with self.assertNumQueries(8):
+            response = self.client.get(f'/api/recipes/{self.recipe.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['ingredients']), 5)
+
+    def test_create(self):
+        data = {
+            'name': 'Новый',
+            'text': 'Описание',
+            'cooking_time': 5,
+            'image': image_data(),
+            'tags': [tag.pk for tag in self.tags],
+            'ingredients': [
+                {'id': ingredient.pk, 'amount': 3}
+                for ingredient in self.ingredients
+            ],
+        }
+        with self.assertNumQueries(18):
+            response = self.client.post('/api/recipes/', data, format='json')
+        self.assertEqual(response.status_code, 201)
+
+    def test_partial_update(self):
+        data = {
+            'name': 'Изменен',
+            'text': 'Описание',
+            'cooking_time': 5,
+            'tags': [self.tags[0].pk],
+            'ingredients': [
+                {'id': ingredient.pk, 'amount': 10}
+                for ingredient in self.ingredients
+            ],
+        }
+        with self.assertNumQueries(23):
+            response = self.client.patch(
+                f'/api/recipes/{self.recipe.pk}/', data, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_destroy(self):
+        with self.assertNumQueries(14):
+            response = self.client.delete(f'/api/recipes/{self.recipe.pk}/')
+        self.assertEqual(response.status_code, 204)
+
+
+class RecipeCursorPaginationTest(TestCase):
+    """Пагинация ленты по курсору (pub_date, id)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        tags, ingredients = create_catalog()
+        author = create_user('author')
+        recipes = [
+            create_recipe(author, tags, ingredients, name=f'Рецепт {index}')
+            for index in range(7)
+        ]
+        # Одинаковая дата у части рецептов: порядок внутри нее по id.
+        Recipe.objects.filter(
+            pk__in=[recipe.pk for recipe in recipes[2:5]]
+        ).update(pub_date=recipes[2].pub_date)
+        cls.expected = list(Recipe.objects.order_by(
+            '-pub_date', '-id'
+        ).values_list('id', flat=True))
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, url='/api/recipes/', **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(set(data), {'next', 'previous', 'results'})
+        return data, [recipe['id'] for recipe in data['results']]
+
+    def test_next(self):
+        data, ids = self.get(cursor='', limit=3)
+        self.assertIsNone(data['previous'])
+        pages = [ids]
+        while data['next']:
+            data, ids = self.get(data['next'])
+            pages.append(ids)
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(sum(pages, []), self.expected)
+
+    def test_previous(self):
+        first, first_ids = self.get(cursor='', limit=3)
+        second, second_ids = self.get(first['next'])
+        third, _ = self.get(second['next'])
+        data, ids = self.get(third['previous'])
+        self.assertEqual(ids, second_ids)
+        data, ids = self.get(data['previous'])
+        self.assertEqual(ids, first_ids)
+        self.assertIsNone(data['previous'])
+        self.assertEqual(self.get(data['next'])[1], second_ids)
+
+    def test_no_count_query(self):
+        with CaptureQueriesContext(connection) as context:
+            self.get(cursor='', limit=3)
+        self.assertFalse([
+            query['sql'] for query in context.captured_queries
+            if 'COUNT(' in query['sql']
+        ])
+
+    def test_invalid_cursor(self):
+        for cursor in (
+            'junk',
+            base64.urlsafe_b64encode(b'a|b|c').decode(),
+            base64.urlsafe_b64encode(b'2024-01-01T00:00:00|1').decode(),
+            base64.urlsafe_b64encode(b'not-a-date|1|0').decode(),
+            base64.urlsafe_b64encode(b'\xff\xfe').decode(),
+        ):
+            with self.subTest(cursor=cursor):
+                response = self.client.get('/api/recipes/', {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(
+                    response.json(), {'detail': 'Неверный курсор.'}
+                )
+
+    def test_page_mode_unchanged(self):
+        response = self.client.get('/api/recipes/', {'limit': 3})
+        self.assertEqual(response.json()['count'], len(self.expected))
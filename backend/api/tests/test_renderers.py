@@ -0,0 +1,93 @@
+import datetime
+from decimal import Decimal
+import io
+import json
+from unittest import mock
+
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+
+
+DATA = {
+    'name': 'Мука пшеничная',
+    'amount': Decimal('1.50'),
+    'pub_date': datetime.datetime(
+        2025, 3, 29, 21, 47, 5, 123456, tzinfo=datetime.timezone.utc
+    ),
+    'tags': [{'id': 1, 'slug': 'breakfast'}],
+}
+
+
+class FastJSONRendererTest(SimpleTestCase):
+
+    def render(self, data, renderer_context=None):
+        return FastJSONRenderer().render(
+            data, 'application/json', renderer_context
+        )
+
+    def test_same_data_as_json_renderer(self):
+        self.assertEqual(
+            json.loads(self.render(DATA)),
+            json.loads(JSONRenderer().render(DATA, 'application/json'))
+        )
+
+    def test_cyrillic_not_escaped(self):
+        content = self.render(DATA)
+        self.assertIn('Мука пшеничная'.encode(), content)
+        self.assertNotIn(b'\\u041c', content)
+
+    def test_int_keys(self):
+        # Так выглядят ошибки ListField: ключ - индекс элемента.
+        errors = {'ids': {0: ['Неверное значение.'], 3: ['Пусто.']}}
+        self.assertEqual(
+            json.loads(self.render(errors)),
+            {'ids': {'0': ['Неверное значение.'], '3': ['Пусто.']}}
+        )
+
+    def test_line_separators_escaped(self):
+        content = self.render({'text': 'a\u2028b\u2029c'})
+        self.assertNotIn('\u2028'.encode(), content)
+        self.assertNotIn('\u2029'.encode(), content)
+        self.assertIn(b'a\\u2028b\\u2029c', content)
+        self.assertEqual(json.loads(content), {'text': 'a\u2028b\u2029c'})
+
+    def test_none(self):
+        self.assertEqual(self.render(None), b'')
+
+    def test_indent_uses_json_renderer(self):
+        content = self.render(DATA, {'indent': 2})
+        self.assertEqual(
+            content,
+            JSONRenderer().render(DATA, 'application/json', {'indent': 2})
+        )
+
+    def test_without_orjson(self):
+        with mock.patch('api.renderers.orjson', None):
+            content = self.render({**DATA, 'ids': {0: ['Пусто.']}})
+        self.assertIn('Мука пшеничная'.encode(), content)
+        self.assertEqual(json.loads(content)['ids'], {'0': ['Пусто.']})
+
+
+class FastJSONParserTest(SimpleTestCase):
+
+    def parse(self, content):
+        return FastJSONParser().parse(io.BytesIO(content))
+
+    def test_parse(self):
+        self.assertEqual(
+            self.parse('{"name": "Мука"}'.encode()), {'name': 'Мука'}
+        )
+
+    def test_invalid(self):
+        with self.assertRaises(ParseError):
+            self.parse(b'{"name": ')
+
+    def test_without_orjson(self):
+        with mock.patch('api.parsers.orjson', None):
+            self.assertEqual(
+                self.parse('{"name": "Мука"}'.encode()), {'name': 'Мука'}
+            )
@@ -0,0 +1,175 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.test import APIClient
+
+from api.mixins import FastRepresentationMixin
+from api.renderers import ShoppingListRenderer
+from api.search import CatalogIndex
+from api.tests.utils import create_catalog, create_recipe, create_user
+from recipes.models import Favorite, Recipe, ShoppingCart
+from users.models import Subscription
+
+
+IMAGE_VARIANTS = {
+    'source': 'recipes/test.png',
+    'variants': {
+        'thumbnail': {
+            'webp': 'recipes/variants/test-thumbnail.webp',
+            'jpeg': 'recipes/variants/test-thumbnail.jpeg',
+        },
+    },
+}
+
+
+class FastSerializersTest(TestCase):
+    """Быстрый путь сериализации дает тот же JSON, что и DRF."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.viewer = create_user('viewer')
+        tags, ingredients = create_catalog(ingredients=4)
+        cls.ingredient = ingredients[0]
+        with_avatar = create_user('with_avatar')
+        with_avatar.avatar = 'avatars/test.png'
+        with_avatar.avatar_variants = IMAGE_VARIANTS
+        with_avatar.save()
+        Subscription.objects.create(user=cls.viewer, author=with_avatar)
+        recipes = [
+            create_recipe(author, tags[:index % 2 + 1], ingredients[index:])
+            for index, author in enumerate(
+                (with_avatar, create_user('plain'), with_avatar)
+            )
+        ]
+        Recipe.objects.filter(pk=recipes[0].pk).update(
+            image_variants=IMAGE_VARIANTS
+        )
+        Favorite.objects.create(user=cls.viewer, recipe=recipes[0])
+        ShoppingCart.objects.create(user=cls.viewer, recipe=recipes[1])
+        cls.recipe = recipes[0]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+
+    def assert_same_content(self, url, params=None):
+        contents = []
+        for fast in (False, True):
+            cache.clear()
+            with override_settings(FAST_SERIALIZERS=fast):
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            contents.append(response.content)
+        self.assertEqual(contents[0], contents[1])
+
+    def test_recipe_list(self):
+        self.assert_same_content('/api/recipes/')
+
+    def test_recipe_list_anonymous(self):
+        self.client.force_authenticate(None)
+        self.assert_same_content('/api/recipes/')
+
+    def test_recipe_detail(self):
+        self.assert_same_content(f'/api/recipes/{self.recipe.pk}/')
+
+    def test_subscriptions(self):
+        self.assert_same_content(
+            '/api/users/subscriptions/', {'recipes_limit': 1}
+        )
+
+    def test_ingredients(self):
+        self.assert_same_content('/api/ingredients/')
+
+    def test_ingredient_detail(self):
+        self.assert_same_content(f'/api/ingredients/{self.ingredient.pk}/')
+
+
+class BulkRelatedFieldTest(TestCase):
+    """Все неверные id тегов и ингредиентов в одном ответе об ошибке."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('author')
+        cls.tags, cls.ingredients = create_catalog()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    @staticmethod
+    def message(code, **kwargs):
+        return str(
+            PrimaryKeyRelatedField.default_error_messages[code]
+        ).format(**kwargs)
+
+    def post(self, tags, ingredient_ids):
+        response = self.client.post('/api/recipes/', {
+            'name': 'Рецепт',
+            'text': 'Описание',
+            'cooking_time': 5,
+            'tags': tags,
+            'ingredients': [
+                {'id': pk, 'amount': 1} for pk in ingredient_ids
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        return response.json()
+
+    def test_all_invalid_tags_reported(self):
+        missing = self.tags[-1].pk + 100
+        with CaptureQueriesContext(connection) as context:
+            errors = self.post(
+                [self.tags[0].pk, missing, 'x', missing + 1, True],
+                [self.ingredients[0].pk]
+            )
+        self.assertEqual(errors['tags'], [
+            self.message('does_not_exist', pk_value=missing),
+            self.message('incorrect_type', data_type='str'),
+            self.message('does_not_exist', pk_value=missing + 1),
+            self.message('incorrect_type', data_type='bool'),
+        ])
+        self.assertEqual(len([
+            query for query in context.captured_queries
+            if 'FROM "recipes_tag"' in query['sql']
+        ]), 1)
+
+    def test_valid_tags_not_reported(self):
+        errors = self.post(
+            [tag.pk for tag in self.tags], [self.ingredients[0].pk]
+        )
+        self.assertNotIn('tags', errors)
+
+    def test_ingredients_loaded_once(self):
+        missing = self.ingredients[-1].pk + 100
+        with CaptureQueriesContext(connection) as context:
+            errors = self.post(
+                [self.tags[0].pk],
+                [self.ingredients[0].pk, missing, self.ingredients[1].pk]
+            )
+        self.assertEqual(errors['ingredients'][1], {
+            'id': [self.message('does_not_exist', pk_value=missing)]
+        })
+        self.assertEqual(len([
+            query for query in context.captured_queries
+            if 'FROM "recipes_ingredient"' in query['sql']
+        ]), 1)
+
+
+class AbstractHooksTest(SimpleTestCase):
+    """Классы без реализации обязательного метода не создаются."""
+
+    def test_fast_representation_required(self):
+        class Serializer(FastRepresentationMixin, serializers.Serializer):
+            pass
+
+        with self.assertRaises(TypeError):
+            Serializer()
+
+    def test_base_classes_abstract(self):
+        for base in (ShoppingListRenderer, CatalogIndex):
+            with self.subTest(base=base.__name__):
+                with self.assertRaises(TypeError):
+                    base()
@@ -0,0 +1,69 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.tests.utils import create_catalog, create_recipe, create_user
+from recipes.models import ShoppingCart
+
+
+URL = '/api/recipes/download_shopping_cart/'
+
+
+class ShoppingCartDownloadTest(TestCase):
+    """ETag списка покупок меняется при любом изменении его данных."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('buyer')
+        _, cls.ingredients = create_catalog(ingredients=2)
+        author = create_user('author')
+        cls.recipes = [
+            create_recipe(author, [], cls.ingredients, amount=amount)
+            for amount in (100, 50)
+        ]
+        for recipe in cls.recipes:
+            ShoppingCart.objects.create(user=cls.user, recipe=recipe)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def download(self, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        response = self.client.get(URL, {'format': 'txt'}, **headers)
+        content = b''.join(getattr(response, 'streaming_content', []))
+        return response, content.decode()
+
+    def test_not_modified(self):
+        response, _ = self.download()
+        response, _ = self.download(response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_recipe_deleted_outside_api(self):
+        response, content = self.download()
+        self.assertIn('150', content)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipes[1].delete()
+        response, content = self.download(response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('100', content)
+        self.assertNotIn('150', content)
+
+    def test_author_deleted(self):
+        response, _ = self.download()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipes[0].author.delete()
+        response, content = self.download(response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Ингредиент', content)
+
+    def test_ingredient_renamed(self):
+        response, _ = self.download()
+        ingredient = self.ingredients[0]
+        ingredient.name = 'Мука'
+        with self.captureOnCommitCallbacks(execute=True):
+            ingredient.save()
+        response, content = self.download(response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Мука', content)
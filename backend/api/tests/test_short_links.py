@@ -0,0 +1,106 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.cache import short_link_cache
+from api.tests.test_recipe_views import image_data
+from api.tests.utils import create_catalog, create_recipe, create_user
+from recipes.models import Recipe, ShortLinkAlias
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ShortLinkTest(TestCase):
+    """Генерация, повтор при совпадении и замена коротких ссылок."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user('author')
+        cls.tags, cls.ingredients = create_catalog()
+        cls.recipe = create_recipe(cls.author, cls.tags, cls.ingredients)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        short_link_cache.data.clear()
+
+    def test_insert_without_savepoint(self):
+        with CaptureQueriesContext(connection) as context:
+            recipe = Recipe.objects.create(
+                author=self.author, name='Без точки сохранения', text='-',
+                cooking_time=1, image='recipes/test.png'
+            )
+        self.assertEqual(len(recipe.slug), 8)
+        self.assertFalse([
+            query['sql'] for query in context.captured_queries
+            if 'SAVEPOINT' in query['sql']
+        ])
+
+    def test_create_retried_on_collision(self):
+        client = APIClient()
+        client.force_authenticate(self.author)
+        data = {
+            'name': 'Новый',
+            'text': 'Описание',
+            'cooking_time': 5,
+            'image': image_data(),
+            'tags': [tag.pk for tag in self.tags],
+            'ingredients': [
+                {'id': ingredient.pk, 'amount': 3}
+                for ingredient in self.ingredients
+            ],
+        }
+        with mock.patch(
+            'recipes.models.generate_short_link',
+            side_effect=[self.recipe.slug, 'Retried1']
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = client.post('/api/recipes/', data, format='json')
+        self.assertEqual(response.status_code, 201)
+        recipe = Recipe.objects.get(pk=response.json()['id'])
+        self.assertEqual(recipe.slug, 'Retried1')
+        self.assertEqual(recipe.ingredient_list.count(), 3)
+
+    def test_shortenlinks_keeps_old_links(self):
+        old_slug = 'a' * 20
+        Recipe.objects.filter(pk=self.recipe.pk).update(slug=old_slug)
+        self.assertEqual(
+            self.client.get(f'/r/{old_slug}/')['Location'],
+            f'/recipes/{self.recipe.pk}/'
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('shortenlinks', stdout=mock.Mock())
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(len(self.recipe.slug), 8)
+        self.assertEqual(
+            ShortLinkAlias.objects.get(slug=old_slug).recipe, self.recipe
+        )
+        cache.clear()
+        short_link_cache.data.clear()
+        for slug in (old_slug, self.recipe.slug):
+            self.assertEqual(
+                self.client.get(f'/r/{slug}/')['Location'],
+                f'/recipes/{self.recipe.pk}/'
+            )
+
+    def test_deleted_alias_forgotten(self):
+        ShortLinkAlias.objects.create(slug='b' * 20, recipe=self.recipe)
+        self.assertEqual(self.client.get(f'/r/{"b" * 20}/').status_code, 302)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe.delete()
+        self.assertEqual(self.client.get(f'/r/{"b" * 20}/').status_code, 404)
@@ -0,0 +1,34 @@
+import os
+import shutil
+import tempfile
+import time
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase
+
+from api.storage import ContentAddressedStorage
+
+
+class ContentAddressedStorageTest(SimpleTestCase):
+
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location, ignore_errors=True)
+        self.storage = ContentAddressedStorage(location=self.location)
+
+    def test_same_content_same_name(self):
+        first = self.storage.save('recipes/a.png', ContentFile(b'image'))
+        second = self.storage.save('recipes/b.PNG', ContentFile(b'image'))
+        self.assertEqual(first, second)
+        self.assertTrue(first.endswith('.png'))
+        other = self.storage.save('recipes/c.png', ContentFile(b'other'))
+        self.assertNotEqual(first, other)
+
+    def test_dedupe_refreshes_mtime(self):
+        name = self.storage.save('recipes/a.png', ContentFile(b'image'))
+        old = time.time() - 24 * 60 * 60
+        os.utime(self.storage.path(name), (old, old))
+        self.storage.save('recipes/b.png', ContentFile(b'image'))
+        self.assertGreater(
+            os.path.getmtime(self.storage.path(name)), time.time() - 60
+        )
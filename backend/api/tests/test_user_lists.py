@@ -0,0 +1,84 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from api.serializers import RecipeShortSerializer
+from api.tests.utils import create_catalog, create_recipe, create_user
+from api.utils import insert_into_user_list
+from recipes.models import Favorite, Recipe, ShoppingCart
+
+
+POSTGRESQL = connection.vendor == 'postgresql'
+
+
+class InsertIntoUserListTest(TestCase):
+    """Добавление рецепта в список и строка, которую возвращает вставка."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('user')
+        tags, ingredients = create_catalog()
+        cls.recipe = create_recipe(create_user('author'), tags, ingredients)
+
+    def insert(self, model=Favorite, recipe_id=None):
+        return insert_into_user_list(
+            model, self.user.pk, recipe_id or self.recipe.pk
+        )
+
+    def assert_short_recipe(self, recipe):
+        self.assertEqual(recipe.pk, self.recipe.pk)
+        with self.assertNumQueries(0):
+            data = RecipeShortSerializer(recipe).data
+        self.assertEqual(data, RecipeShortSerializer(self.recipe).data)
+
+    def test_new(self):
+        recipe = self.insert()
+        self.assertIs(recipe.inserted, True)
+        self.assert_short_recipe(recipe)
+        self.assertTrue(Favorite.objects.filter(
+            user=self.user, recipe=self.recipe
+        ).exists())
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favorite_count, 1)
+        self.assertEqual(self.recipe.shopping_cart_count, 0)
+
+    def test_duplicate(self):
+        self.insert()
+        recipe = self.insert()
+        self.assertIs(recipe.inserted, False)
+        self.assert_short_recipe(recipe)
+        self.assertEqual(Favorite.objects.count(), 1)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favorite_count, 1)
+
+    def test_lists_are_independent(self):
+        self.insert(Favorite)
+        self.assertIs(self.insert(ShoppingCart).inserted, True)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favorite_count, 1)
+        self.assertEqual(self.recipe.shopping_cart_count, 1)
+
+    def test_missing_recipe(self):
+        self.assertIsNone(self.insert(recipe_id=self.recipe.pk + 100))
+        self.assertFalse(Favorite.objects.exists())
+
+    @skipUnless(POSTGRESQL, 'INSERT ... ON CONFLICT в CTE только в PostgreSQL')
+    def test_postgresql_single_query(self):
+        for inserted in (True, False):
+            with self.assertNumQueries(1):
+                recipe = self.insert()
+            self.assertIs(recipe.inserted, inserted)
+            self.assert_short_recipe(recipe)
+            # Строка берется из CTE до увеличения счетчика, поэтому
+            # счетчики в ответ не попадают и читаются отдельно.
+            self.assertIn('favorite_count', recipe.get_deferred_fields())
+        self.assertEqual(Recipe.objects.get(
+            pk=self.recipe.pk
+        ).favorite_count, 1)
+
+    @skipUnless(POSTGRESQL, 'INSERT ... ON CONFLICT в CTE только в PostgreSQL')
+    def test_postgresql_missing_recipe(self):
+        with self.assertNumQueries(1):
+            self.assertIsNone(self.insert(recipe_id=self.recipe.pk + 100))
+        self.assertFalse(Favorite.objects.exists())
@@ -0,0 +1,51 @@
+from django.contrib.auth import get_user_model
+
+from recipes.models import Ingredient, IngredientInRecipe, Recipe, Tag
+
+
+User = get_user_model()
+
+RECIPE_IMAGE = 'recipes/test.png'
+
+
+def create_user(username, **kwargs):
+    return User.objects.create_user(
+        username=username,
+        email=f'{username}@example.com',
+        password='password',
+        first_name='Имя',
+        last_name='Фамилия',
+        **kwargs
+    )
+
+
+def create_catalog(tags=2, ingredients=3):
+    """Теги и ингредиенты для тестовых рецептов."""
+    return (
+        [
+            Tag.objects.create(name=f'Тег {index}', slug=f'tag{index}')
+            for index in range(tags)
+        ],
+        [
+            Ingredient.objects.create(
+                name=f'Ингредиент {index}', measurement_unit='г'
+            )
+            for index in range(ingredients)
+        ],
+    )
+
+
+def create_recipe(author, tags, ingredients, name='Рецепт', amount=10):
+    recipe = Recipe.objects.create(
+        author=author,
+        name=name,
+        text='Описание',
+        image=RECIPE_IMAGE,
+        cooking_time=10,
+    )
+    recipe.tags.set(tags)
+    IngredientInRecipe.objects.bulk_create([
+        IngredientInRecipe(recipe=recipe, ingredient=ingredient, amount=amount)
+        for ingredient in ingredients
+    ])
+    return recipe
@@ -26,6 +26,12 @@ urls_ver1 = [
             {'get': 'list'}),
         name='subscriptions'
     ),
+    path(
+        'users/subscribe/',
+        SubscriptionViewSet.as_view(
+            {'post': 'subscribe_bulk', 'delete': 'unsubscribe_bulk'}),
+        name='subscribe-bulk'
+    ),
     path(
         'users/<int:pk>/subscribe/',
         SubscriptionViewSet.as_view(
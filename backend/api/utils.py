@@ -1,41 +1,242 @@
+from django.db import connection, transaction
+from django.db.models import F
+from django.http import Http404
 from rest_framework import serializers, status
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 
-from recipes.models import IngredientInRecipe
+from api.cache import bump_recipe_shopping_carts, bump_user_list_version
+from api.constants import USER_LIST_RECIPE_FIELDS
+from recipes.models import Favorite, IngredientInRecipe, Recipe, ShoppingCart
 
 
-def add_to_user_list(model, serializer_class, user, recipe):
+RECIPE_NOT_FOUND = 'No Recipe matches the given query.'
+
+RECIPE_USER_LISTS = {
+    'is_favorited': Favorite,
+    'is_in_shopping_cart': ShoppingCart,
+}
+
+# Счетчики рецепта, которые поддерживаются при изменении списков.
+USER_LIST_COUNTERS = {
+    Favorite: 'favorite_count',
+    ShoppingCart: 'shopping_cart_count',
+}
+
+
+def change_user_list_counter(model, recipe_ids, delta):
+    """Атомарное изменение счетчика списка у рецептов через F().
+
+    Счетчик не уменьшается ниже нуля; расхождения с реальным числом
+    записей исправляет команда reconcilecounters.
+    """
+    field = USER_LIST_COUNTERS[model]
+    recipes = Recipe.objects.filter(pk__in=recipe_ids)
+    if delta < 0:
+        recipes = recipes.filter(**{f'{field}__gte': -delta})
+    recipes.update(**{field: F(field) + delta})
+
+
+def already_in_list_error(recipe):
+    return {
+        'errors': f'Повторно "{recipe.name}" добавить нельзя, '
+        f'он уже есть в списке.'
+    }
+
+
+def not_in_list_error(recipe):
+    return {'errors': f'Рецепт "{recipe.name}" отсутствует в списке.'}
+
+
+def bulk_result(pk, status_code, data=None):
+    """Результат обработки одного id в пакетном запросе."""
+    result = {'id': pk, 'status': status_code}
+    if data is not None:
+        result['data'] = data
+    return result
+
+
+def not_found_result(pk):
+    return bulk_result(
+        pk, status.HTTP_404_NOT_FOUND, {'detail': NotFound.default_detail}
+    )
+
+
+def get_recipe_id(pk):
+    """id рецепта из URL или 404 для нечислового значения."""
+    if not str(pk).isdigit():
+        raise Http404(RECIPE_NOT_FOUND)
+    return int(pk)
+
+
+def insert_into_user_list(model, user_id, recipe_id):
+    """Добавление рецепта в список одним запросом.
+
+    Возвращает рецепт с полями RecipeShortSerializer и признаком
+    inserted (False, если рецепт уже был в списке) или None, если
+    рецепта нет. В Postgres существование рецепта, вставка, увеличение
+    счетчика рецепта и выборка полей ответа выполняются одним запросом
+    с INSERT ... ON CONFLICT DO NOTHING RETURNING в CTE, в остальных
+    БД - через get_or_create.
+    """
+    if connection.vendor != 'postgresql':
+        recipe = Recipe.objects.filter(pk=recipe_id).only(
+            *USER_LIST_RECIPE_FIELDS
+        ).first()
+        if recipe is not None:
+            _, recipe.inserted = model.objects.get_or_create(
+                user_id=user_id, recipe=recipe
+            )
+            if recipe.inserted:
+                change_user_list_counter(model, [recipe.pk], 1)
+        return recipe
+    quote = connection.ops.quote_name
+    recipe_table = quote(Recipe._meta.db_table)
+    counter = quote(USER_LIST_COUNTERS[model])
+    sql = (
+        f'WITH recipe AS ('
+        f'SELECT {", ".join(map(quote, USER_LIST_RECIPE_FIELDS))} '
+        f'FROM {recipe_table} WHERE id = %s'
+        f'), inserted AS ('
+        f'INSERT INTO {quote(model._meta.db_table)} (user_id, recipe_id) '
+        f'SELECT %s, id FROM recipe '
+        f'ON CONFLICT (user_id, recipe_id) DO NOTHING RETURNING recipe_id'
+        f'), counted AS ('
+        f'UPDATE {recipe_table} SET {counter} = {counter} + 1 '
+        f'WHERE id IN (SELECT recipe_id FROM inserted)'
+        f') SELECT recipe.*, EXISTS (SELECT 1 FROM inserted) AS inserted '
+        f'FROM recipe'
+    )
+    return next(iter(Recipe.objects.raw(sql, [recipe_id, user_id])), None)
+
+
+def add_to_user_list(model, serializer_class, user, recipe_id):
     """
     Метод для добавления рецепта в пользовательский список
     (избранное/корзину).
     """
-    _, created = model.objects.get_or_create(user=user, recipe=recipe)
-    if not created:
+    recipe = insert_into_user_list(model, user.pk, get_recipe_id(recipe_id))
+    if recipe is None:
+        raise Http404(RECIPE_NOT_FOUND)
+    if not recipe.inserted:
         return Response(
-            {'errors': f'Повторно "{recipe.name}" добавить нельзя, '
-             f'он уже есть в списке.'},
+            already_in_list_error(recipe),
             status=status.HTTP_400_BAD_REQUEST
         )
+    bump_user_list_version(model, user.pk)
     serializer = serializer_class(recipe)
     return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-def remove_from_user_list(model, user, recipe):
+def remove_from_user_list(model, user, recipe_id):
     """
     Метод для удаления рецепта из пользовательского списка
     (избранного/корзины).
+
+    Рецепт загружается только для ответа об ошибке.
     """
-    deleted_count, _ = model.objects.filter(user=user, recipe=recipe).delete()
+    recipe_id = get_recipe_id(recipe_id)
+    deleted_count, _ = model.objects.filter(
+        user=user, recipe_id=recipe_id
+    ).delete()
 
     if deleted_count == 0:
+        recipe = Recipe.objects.filter(pk=recipe_id).only('name').first()
+        if recipe is None:
+            raise Http404(RECIPE_NOT_FOUND)
         return Response(
-            {'errors': f'Рецепт "{recipe.name}" отсутствует в списке.'},
+            not_in_list_error(recipe),
             status=status.HTTP_400_BAD_REQUEST
         )
+    change_user_list_counter(model, [recipe_id], -1)
+    bump_user_list_version(model, user.pk)
 
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+@transaction.atomic
+def bulk_add_to_user_list(model, serializer_class, user, recipe_ids):
+    """
+    Пакетное добавление рецептов в пользовательский список.
+
+    Рецепты и уже добавленные id читаются двумя запросами, новые записи
+    вставляются одним bulk_create. Для каждого id возвращается тот же
+    статус и ответ, что и у add_to_user_list.
+    """
+    recipe_ids = list(dict.fromkeys(recipe_ids))
+    recipes = Recipe.objects.only(*USER_LIST_RECIPE_FIELDS).in_bulk(
+        recipe_ids
+    )
+    existing = set(model.objects.filter(
+        user=user, recipe_id__in=recipes
+    ).values_list('recipe_id', flat=True))
+    new = [
+        model(user=user, recipe=recipe)
+        for pk, recipe in recipes.items() if pk not in existing
+    ]
+    if new:
+        model.objects.bulk_create(new, ignore_conflicts=True)
+        change_user_list_counter(
+            model, [item.recipe_id for item in new], 1
+        )
+        bump_user_list_version(model, user.pk)
+
+    results = []
+    for pk in recipe_ids:
+        recipe = recipes.get(pk)
+        if recipe is None:
+            results.append(not_found_result(pk))
+        elif pk in existing:
+            results.append(bulk_result(
+                pk, status.HTTP_400_BAD_REQUEST, already_in_list_error(recipe)
+            ))
+        else:
+            results.append(bulk_result(
+                pk, status.HTTP_201_CREATED, serializer_class(recipe).data
+            ))
+    return results
+
+
+@transaction.atomic
+def bulk_remove_from_user_list(model, user, recipe_ids):
+    """
+    Пакетное удаление рецептов из пользовательского списка.
+
+    Записи удаляются одним запросом, рецепты загружаются только
+    для ответов об ошибках.
+    """
+    recipe_ids = list(dict.fromkeys(recipe_ids))
+    user_list = model.objects.filter(user=user, recipe_id__in=recipe_ids)
+    existing = set(user_list.values_list('recipe_id', flat=True))
+    if existing:
+        user_list.delete()
+        change_user_list_counter(model, existing, -1)
+        bump_user_list_version(model, user.pk)
+    missing = Recipe.objects.only('name').in_bulk(
+        [pk for pk in recipe_ids if pk not in existing]
+    )
+
+    results = []
+    for pk in recipe_ids:
+        if pk in existing:
+            results.append(bulk_result(pk, status.HTTP_204_NO_CONTENT))
+        elif pk in missing:
+            results.append(bulk_result(
+                pk, status.HTTP_400_BAD_REQUEST, not_in_list_error(missing[pk])
+            ))
+        else:
+            results.append(not_found_result(pk))
+    return results
+
+
+def get_recipes_limit(request):
+    """Значение параметра recipes_limit или None, если он не задан."""
+    limit = request.query_params.get('recipes_limit') if request else None
+    if limit and limit.isdigit():
+        return int(limit)
+    return None
+
+
 def validate_not_empty(value, field_name):
     """
     Универсальная функция для проверки, что поле не пустое.
@@ -50,21 +251,51 @@ def validate_not_empty(value, field_name):
 def processing_recipe_ingredients_and_tags(
     recipe,
     ingredients_data,
-    tags
+    tags,
+    created=False
 ):
     """
     Универсальная функция для обрабатки ингредиентов и тегов рецепта.
+
+    При обновлении существующие строки IngredientInRecipe сравниваются
+    с новыми данными: добавляются только новые ингредиенты, меняется
+    количество у измененных и одним запросом удаляются лишние.
     """
-    recipe.tags.set(tags)
-    if recipe.pk:
-        recipe.ingredients.clear()
-    ingredients = [
-        IngredientInRecipe(
-            recipe=recipe,
-            ingredient=item['ingredient'],
-            amount=item['amount']
-        ) for item in ingredients_data
-    ]
-    IngredientInRecipe.objects.bulk_create(ingredients)
+    if created:
+        recipe.tags.add(*tags)
+        existing = {}
+    else:
+        recipe.tags.set(tags)
+        existing = {
+            row.ingredient_id: row
+            for row in IngredientInRecipe.objects.filter(
+                recipe=recipe
+            ).only('id', 'ingredient_id', 'amount')
+        }
+
+    to_create = []
+    to_update = []
+    for item in ingredients_data:
+        row = existing.pop(item['ingredient'].pk, None)
+        if row is None:
+            to_create.append(IngredientInRecipe(
+                recipe=recipe,
+                ingredient=item['ingredient'],
+                amount=item['amount']
+            ))
+        elif row.amount != item['amount']:
+            row.amount = item['amount']
+            to_update.append(row)
+
+    if existing:
+        IngredientInRecipe.objects.filter(
+            pk__in=[row.pk for row in existing.values()]
+        ).delete()
+    if to_update:
+        IngredientInRecipe.objects.bulk_update(to_update, ['amount'])
+    if to_create:
+        IngredientInRecipe.objects.bulk_create(to_create)
+    if not created and (existing or to_update or to_create):
+        bump_recipe_shopping_carts(recipe)
 
     return recipe
@@ -1,8 +1,19 @@
 from django.contrib.auth import get_user_model
-from django.db.models import BooleanField, Count, Exists, OuterRef, Sum, Value
-from django.http import HttpResponse
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import (
+    BooleanField,
+    Exists,
+    OuterRef,
+    Prefetch,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django_filters.rest_framework import DjangoFilterBackend
 from djoser.views import UserViewSet as DjoserUserViewSet
 from rest_framework import filters, mixins, permissions, status, viewsets
@@ -14,11 +25,28 @@ from rest_framework.permissions import (
 )
 from rest_framework.response import Response
 
+from api.cache import (
+    INGREDIENTS_VERSION_KEY,
+    TAGS_VERSION_KEY,
+    get_shopping_cart_version,
+    iterate_and_cache,
+    shopping_cart_ingredients_key,
+)
+from api.constants import (
+    RECIPE_LIST_FIELDS,
+    RECIPE_LIST_INGREDIENT_FIELDS,
+    SHOPPING_CART_CACHE_TIMEOUT,
+    SHOPPING_LIST_CHUNK_SIZE,
+)
 from api.filters import IngredientFilter, RecipeFilter
-from api.pagination import PageNumberLimitPagination
+from api.mixins import CachedCatalogMixin
+from api.pagination import PageNumberLimitPagination, RecipePagination
 from api.permissions import IsAuthorOrReadOnly
+from api.renderers import SHOPPING_LIST_RENDERERS
+from api.search import ingredient_index
 from api.serializers import (
     AvatarSerializer,
+    BulkIdsSerializer,
     IngredientSerializer,
     RecipeReadSerializer,
     RecipeShortSerializer,
@@ -27,7 +55,14 @@ from api.serializers import (
     TagSerializer,
     UserSerializer,
 )
-from api.utils import add_to_user_list, remove_from_user_list
+from api.utils import (
+    add_to_user_list,
+    bulk_add_to_user_list,
+    bulk_remove_from_user_list,
+    bulk_result,
+    get_recipes_limit,
+    remove_from_user_list,
+)
 from recipes.models import (
     Favorite,
     Ingredient,
@@ -49,6 +84,19 @@ class UserViewSet(DjoserUserViewSet):
     pagination_class = PageNumberLimitPagination
     serializer_class = UserSerializer
 
+    def get_queryset(self):
+        """Список пользователей с признаком подписки одним запросом."""
+        user = self.request.user
+        queryset = super().get_queryset()
+        if user.is_authenticated:
+            return queryset.annotate(
+                is_subscribed=Exists(Subscription.objects.filter(
+                    user=user, author=OuterRef('pk')))
+            )
+        return queryset.annotate(
+            is_subscribed=Value(False, output_field=BooleanField())
+        )
+
     @action(
         detail=False,
         methods=['get'],
@@ -89,15 +137,15 @@ class UserViewSet(DjoserUserViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        user.avatar.delete()
         user.avatar = None
         user.save()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class TagsViewSet(viewsets.ReadOnlyModelViewSet):
+class TagsViewSet(CachedCatalogMixin, viewsets.ReadOnlyModelViewSet):
     """Вьюсет для тегов."""
 
+    catalog_version_key = TAGS_VERSION_KEY
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = (AllowAny,)
@@ -108,29 +156,33 @@ class RecipesViewSet(viewsets.ModelViewSet):
     """Вьюсет для рецептов."""
 
     permission_classes = (IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly,)
-    pagination_class = PageNumberLimitPagination
+    pagination_class = RecipePagination
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
 
     def get_queryset(self):
-        """Получение списка рецептов с учетом подписок и избранного."""
-        user = self.request.user
-        recipes = Recipe.objects.prefetch_related(
-            'ingredient_list__ingredient',
-            'tags',
-            'author'
-        ).all()
+        """Получение списка рецептов.
 
-        if user.is_authenticated:
-            return recipes.annotate(
-                is_favorited=Exists(Favorite.objects.filter(
-                    user=user, recipe=OuterRef('pk'))),
-                is_in_shopping_cart=Exists(ShoppingCart.objects.filter(
-                    user=user, recipe=OuterRef('pk')))
+        Для списка автор загружается JOIN-ом, а из рецептов, авторов
+        и ингредиентов выбираются только поля RecipeReadSerializer.
+        Признаки is_favorited и is_in_shopping_cart вычисляются
+        сериализатором по кешированным спискам id пользователя.
+        """
+        if self.action == 'list':
+            return Recipe.objects.select_related('author').only(
+                *RECIPE_LIST_FIELDS
+            ).prefetch_related(
+                Prefetch(
+                    'ingredient_list',
+                    queryset=IngredientInRecipe.objects.select_related(
+                        'ingredient'
+                    ).only(*RECIPE_LIST_INGREDIENT_FIELDS)
+                ),
+                'tags',
             )
-        return recipes.annotate(
-            is_favorited=Value(False, output_field=BooleanField()),
-            is_in_shopping_cart=Value(False, output_field=BooleanField())
+        return Recipe.objects.select_related('author').prefetch_related(
+            'ingredient_list__ingredient',
+            'tags',
         )
 
     def get_serializer_class(self):
@@ -161,19 +213,18 @@ class RecipesViewSet(viewsets.ModelViewSet):
     )
     def favorite(self, request, pk):
         """Управление избранным."""
-        recipe = get_object_or_404(Recipe, pk=pk)
         if request.method == 'POST':
             return add_to_user_list(
                 model=Favorite,
                 serializer_class=RecipeShortSerializer,
                 user=request.user,
-                recipe=recipe
+                recipe_id=pk
             )
 
         return remove_from_user_list(
             model=Favorite,
             user=request.user,
-            recipe=recipe
+            recipe_id=pk
         )
 
     @action(
@@ -185,32 +236,60 @@ class RecipesViewSet(viewsets.ModelViewSet):
     )
     def shopping_cart(self, request, pk=None):
         """Управление списком покупок."""
-        recipe = get_object_or_404(Recipe, pk=pk)
         if request.method == 'POST':
             return add_to_user_list(
                 model=ShoppingCart,
                 serializer_class=RecipeShortSerializer,
                 user=request.user,
-                recipe=recipe
+                recipe_id=pk
             )
         return remove_from_user_list(
             model=ShoppingCart,
             user=request.user,
-            recipe=recipe
+            recipe_id=pk
         )
 
+    @action(
+        detail=False,
+        methods=['post', 'delete'],
+        permission_classes=(IsAuthenticated,),
+        url_path='favorite',
+        url_name='favorite-bulk',
+    )
+    def favorite_bulk(self, request):
+        """Пакетное управление избранным."""
+        return self.process_user_list_bulk(request, Favorite)
+
+    @action(
+        detail=False,
+        methods=['post', 'delete'],
+        permission_classes=(IsAuthenticated,),
+        url_path='shopping_cart',
+        url_name='shopping_cart-bulk',
+    )
+    def shopping_cart_bulk(self, request):
+        """Пакетное управление списком покупок."""
+        return self.process_user_list_bulk(request, ShoppingCart)
+
     @staticmethod
-    def ingredients_to_txt(ingredients):
-        """Метод для объединения ингредиентов в список для загрузки."""
-
-        shopping_list = 'Список покупок:\n\n'
-        for item in ingredients:
-            shopping_list += (
-                f"{item['ingredient__name']} "
-                f"({item['ingredient__measurement_unit']}) — "
-                f"{item['total']}\n"
+    def process_user_list_bulk(request, model):
+        serializer = BulkIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        if request.method == 'POST':
+            results = bulk_add_to_user_list(
+                model=model,
+                serializer_class=RecipeShortSerializer,
+                user=request.user,
+                recipe_ids=ids
             )
-        return shopping_list
+        else:
+            results = bulk_remove_from_user_list(
+                model=model,
+                user=request.user,
+                recipe_ids=ids
+            )
+        return Response({'results': results}, status=status.HTTP_200_OK)
 
     @action(
         detail=False,
@@ -218,25 +297,64 @@ class RecipesViewSet(viewsets.ModelViewSet):
         permission_classes=(IsAuthenticated,),
         url_path='download_shopping_cart',
         url_name='download_shopping_cart',
+        renderer_classes=SHOPPING_LIST_RENDERERS,
     )
     def download_shopping_cart(self, request):
         """Метод для загрузки ингредиентов и их количества
            для выбранных рецептов.
+
+           Формат файла выбирается параметром ?format= (txt, csv, pdf),
+           строки агрегата читаются курсором и отдаются потоком.
+           Агрегат кешируется по версии корзины, повторная загрузка
+           с If-None-Match получает 304.
         """
+        user = request.user
+        renderer = request.accepted_renderer
+        version = get_shopping_cart_version(user.pk)
+        etag = f'"{version}-{renderer.format}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            content_type = renderer.media_type
+            if renderer.charset:
+                content_type = f'{content_type}; charset={renderer.charset}'
+            response = StreamingHttpResponse(
+                renderer.stream(
+                    self.get_shopping_cart_ingredients(user, version)
+                ),
+                content_type=content_type
+            )
+            response['Content-Disposition'] = (
+                f'attachment; filename="shopping_list.{renderer.format}"'
+            )
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    @staticmethod
+    def get_shopping_cart_ingredients(user, version):
+        """Агрегат ингредиентов корзины из кеша или из БД."""
+        key = shopping_cart_ingredients_key(user.pk, version)
+        ingredients = cache.get(key)
+        if ingredients is not None:
+            return ingredients
         ingredients = IngredientInRecipe.objects.filter(
-            recipe__shoppingcart_recipe__user=request.user
+            recipe__shoppingcart_recipe__user=user
         ).values(
             'ingredient__name',
             'ingredient__measurement_unit'
         ).annotate(total=Sum('amount')
                    ).order_by('ingredient__name')
-        shopping_list = self.ingredients_to_txt(ingredients)
-        return HttpResponse(shopping_list, content_type='text/plain')
+        return iterate_and_cache(
+            ingredients.iterator(chunk_size=SHOPPING_LIST_CHUNK_SIZE),
+            key,
+            SHOPPING_CART_CACHE_TIMEOUT
+        )
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(CachedCatalogMixin, viewsets.ReadOnlyModelViewSet):
     """Вьюсет для ингредиентов."""
 
+    catalog_version_key = INGREDIENTS_VERSION_KEY
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = (AllowAny,)
@@ -246,6 +364,13 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     filterset_fields = ('name',)
     filterset_class = IngredientFilter
 
+    def list(self, request, *args, **kwargs):
+        """Поиск по началу названия обслуживается индексом в памяти."""
+        name = request.query_params.get('name')
+        if not name or 'search' in request.query_params:
+            return super().list(request, *args, **kwargs)
+        return Response(ingredient_index.search(name))
+
 
 class SubscriptionViewSet(
     mixins.ListModelMixin,
@@ -256,11 +381,32 @@ class SubscriptionViewSet(
     pagination_class = PageNumberLimitPagination
 
     def get_queryset(self):
-        return User.objects.filter(
+        """Подписки с рецептами, ограниченными recipes_limit на стороне БД."""
+        return self.annotate_authors(User.objects.filter(
             subscribed__user=self.request.user
-        ).annotate(
-            recipes_count=Count('recipes')
-        ).prefetch_related('recipes').order_by('username')
+        )).order_by('username')
+
+    def annotate_authors(self, queryset):
+        """Авторы с рецептами для SubscriptionSerializer.
+
+        Число рецептов берется из счетчика User.recipes_count.
+        """
+        recipes = Recipe.objects.only(
+            'id', 'name', 'image', 'image_variants', 'cooking_time',
+            'author_id'
+        )
+        limit = get_recipes_limit(self.request)
+        if limit is not None:
+            recipes = recipes.filter(pk__in=Subquery(
+                Recipe.objects.filter(
+                    author=OuterRef('author')
+                ).values('pk')[:limit]
+            ))
+        return queryset.annotate(
+            is_subscribed=Value(True, output_field=BooleanField())
+        ).prefetch_related(
+            Prefetch('recipes', queryset=recipes, to_attr='short_recipes')
+        )
 
     @action(
         detail=True,
@@ -321,3 +467,80 @@ class SubscriptionViewSet(
             )
 
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @transaction.atomic
+    def subscribe_bulk(self, request):
+        """Пакетная подписка на авторов.
+
+        Для каждого id возвращается тот же статус и ответ, что и у subscribe.
+        """
+        ids = self.get_bulk_ids(request)
+        user = request.user
+        authors = self.annotate_authors(User.objects.all()).in_bulk(ids)
+        existing = set(Subscription.objects.filter(
+            user=user, author_id__in=authors
+        ).values_list('author_id', flat=True))
+        Subscription.objects.bulk_create([
+            Subscription(user=user, author_id=pk)
+            for pk in authors if pk not in existing and pk != user.pk
+        ], ignore_conflicts=True)
+
+        results = []
+        for pk in ids:
+            if pk not in authors:
+                results.append(bulk_result(
+                    pk, status.HTTP_404_NOT_FOUND,
+                    {'error': 'Пользователь не найден'}
+                ))
+            elif pk == user.pk:
+                results.append(bulk_result(
+                    pk, status.HTTP_400_BAD_REQUEST,
+                    {'error': 'Нельзя подписаться на себя'}
+                ))
+            elif pk in existing:
+                results.append(bulk_result(
+                    pk, status.HTTP_400_BAD_REQUEST,
+                    {'error': 'Вы уже подписаны'}
+                ))
+            else:
+                results.append(bulk_result(
+                    pk, status.HTTP_201_CREATED,
+                    self.get_serializer(authors[pk]).data
+                ))
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
+    @transaction.atomic
+    def unsubscribe_bulk(self, request):
+        """Пакетная отписка от авторов одним запросом на удаление."""
+        ids = self.get_bulk_ids(request)
+        subscriptions = Subscription.objects.filter(
+            user=request.user, author_id__in=ids
+        )
+        existing = set(subscriptions.values_list('author_id', flat=True))
+        if existing:
+            subscriptions.delete()
+        authors = set(User.objects.filter(
+            pk__in=[pk for pk in ids if pk not in existing]
+        ).values_list('pk', flat=True))
+
+        results = []
+        for pk in ids:
+            if pk in existing:
+                results.append(bulk_result(pk, status.HTTP_204_NO_CONTENT))
+            elif pk in authors:
+                results.append(bulk_result(
+                    pk, status.HTTP_400_BAD_REQUEST,
+                    {'error': 'Подписка не найдена'}
+                ))
+            else:
+                results.append(bulk_result(
+                    pk, status.HTTP_404_NOT_FOUND,
+                    {'error': 'Пользователь не найден'}
+                ))
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
+    @staticmethod
+    def get_bulk_ids(request):
+        serializer = BulkIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return list(dict.fromkeys(serializer.validated_data['ids']))
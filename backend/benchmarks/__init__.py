@@ -0,0 +1,9 @@
+"""Бенчмарки производительности API.
+
+Запускаются из каталога backend как модули, например::
+
+    DB_ENGINE=django.db.backends.sqlite3 python -m benchmarks.recipe_list
+
+Данные создаются в отдельной тестовой БД, которая удаляется после
+замера, рабочая БД не затрагивается.
+"""
@@ -0,0 +1,129 @@
+from contextlib import contextmanager
+import os
+import random
+import statistics
+import time
+
+import django
+
+
+BENCHMARK_IMAGE = 'recipes/benchmark.png'
+BATCH_SIZE = 5000
+
+
+@contextmanager
+def benchmark_database():
+    """Настройка Django и временная тестовая БД на время замеров."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foodgram.settings')
+    django.setup()
+    from django.test.utils import (
+        setup_databases,
+        setup_test_environment,
+        teardown_databases,
+        teardown_test_environment,
+    )
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(func, repeat=20, warmup=2):
+    """Медианное время вызова func в миллисекундах."""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def print_table(headers, rows):
+    widths = [
+        max(len(str(value)) for value in column)
+        for column in zip(headers, *rows)
+    ]
+    for row in (headers, *rows):
+        print('  '.join(
+            str(value).rjust(width) for value, width in zip(row, widths)
+        ))
+
+
+def seed(recipes, authors=50, tags=5, ingredients=200, per_recipe=8,
+         tags_per_recipe=(1, 3)):
+    """Пакетное создание данных без сигналов моделей.
+
+    Возвращает список id рецептов. Счетчики и варианты изображений
+    не заполняются: бенчмаркам они не нужны.
+    """
+    from django.contrib.auth import get_user_model
+
+    from recipes.models import Ingredient, IngredientInRecipe, Recipe, Tag
+
+    User = get_user_model()
+    rng = random.Random(0)
+    User.objects.bulk_create([
+        User(
+            username=f'author{index}',
+            email=f'author{index}@example.com',
+            first_name='Имя',
+            last_name='Фамилия',
+            password='!',
+        )
+        for index in range(authors)
+    ])
+    Tag.objects.bulk_create([
+        Tag(name=f'Тег {index}', slug=f'tag{index}')
+        for index in range(tags)
+    ])
+    Ingredient.objects.bulk_create([
+        Ingredient(name=f'Ингредиент {index}', measurement_unit='г')
+        for index in range(ingredients)
+    ])
+    author_ids = list(User.objects.values_list('id', flat=True))
+    tag_ids = list(Tag.objects.values_list('id', flat=True))
+    ingredient_ids = list(Ingredient.objects.values_list('id', flat=True))
+    Recipe.objects.bulk_create(
+        (
+            Recipe(
+                author_id=rng.choice(author_ids),
+                name=f'Рецепт {index}',
+                text='Описание рецепта. ' * 10,
+                image=BENCHMARK_IMAGE,
+                cooking_time=rng.randint(5, 120),
+                slug=f'bench{index}',
+            )
+            for index in range(recipes)
+        ),
+        batch_size=BATCH_SIZE
+    )
+    recipe_ids = list(Recipe.objects.values_list('id', flat=True))
+    Recipe.tags.through.objects.bulk_create(
+        (
+            Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+            for recipe_id in recipe_ids
+            for tag_id in rng.sample(
+                tag_ids, rng.randint(*tags_per_recipe)
+            )
+        ),
+        batch_size=BATCH_SIZE
+    )
+    IngredientInRecipe.objects.bulk_create(
+        (
+            IngredientInRecipe(
+                recipe_id=recipe_id,
+                ingredient_id=ingredient_id,
+                amount=rng.randint(1, 500),
+            )
+            for recipe_id in recipe_ids
+            for ingredient_id in rng.sample(ingredient_ids, per_recipe)
+        ),
+        batch_size=BATCH_SIZE
+    )
+    return recipe_ids
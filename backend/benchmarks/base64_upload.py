@@ -0,0 +1,87 @@
+"""Пиковая память при загрузке изображения в Base64.
+
+Сравнивается декодирование всей строки одним вызовом b64decode с
+декодированием частями в Base64ImageField. Память измеряется
+tracemalloc для одной загрузки и для нескольких одновременных
+загрузок в потоках, строка запроса в замер не входит.
+"""
+import argparse
+import base64
+from concurrent.futures import ThreadPoolExecutor
+import io
+import os
+import threading
+import tracemalloc
+
+from benchmarks.base import benchmark_database, print_table
+
+
+def image_payload(megabytes):
+    """data URI с PNG из случайного шума размером около megabytes МБ."""
+    from PIL import Image
+
+    side = int((megabytes * 1024 * 1024 / 3) ** 0.5)
+    image = Image.frombytes('RGB', (side, side), os.urandom(side * side * 3))
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG', compress_level=0)
+    encoded = base64.b64encode(buffer.getvalue()).decode()
+    return f'data:image/png;base64,{encoded}'
+
+
+def decode_whole(data):
+    from django.core.files.base import ContentFile
+
+    header, payload = data.split(';base64,')
+    return ContentFile(base64.b64decode(payload), name='image.png')
+
+
+def decode_chunked(data):
+    from api.fields import Base64ImageField
+
+    return Base64ImageField().to_internal_value(data)
+
+
+def peak_memory(decode, data, concurrency):
+    """Пиковая память в МБ при concurrency одновременных загрузках.
+
+    Первый вызов вне замера: импорт модулей Pillow в пик не входит.
+    """
+    barrier = threading.Barrier(concurrency)
+
+    def upload():
+        barrier.wait()
+        decode(data).close()
+
+    decode(data).close()
+    tracemalloc.start()
+    with ThreadPoolExecutor(concurrency) as executor:
+        for future in [executor.submit(upload) for _ in range(concurrency)]:
+            future.result()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 5, 9])
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        rows = []
+        for megabytes in args.sizes:
+            data = image_payload(megabytes)
+            for concurrency in (1, args.concurrency):
+                rows.append((
+                    megabytes, concurrency,
+                    f'{peak_memory(decode_whole, data, concurrency):.1f}',
+                    f'{peak_memory(decode_chunked, data, concurrency):.1f}',
+                ))
+        print_table(
+            ('размер, МБ', 'загрузок', 'целиком, МБ', 'частями, МБ'), rows
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Размер и время сжатия ответов API при разных степенях gzip и brotli.
+
+Полезная нагрузка - весь справочник ингредиентов и страница рецептов
+в том виде, в каком их отдает API без сжатия.
+"""
+import argparse
+
+from benchmarks.base import benchmark_database, measure, print_table, seed
+
+
+LEVELS = (
+    ('gzip', 6), ('gzip', 9), ('br', 5), ('br', 11),
+)
+
+
+def size(value):
+    if value >= 1024:
+        return f'{value / 1024:.1f} КБ'
+    return f'{value} Б'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ingredients', type=int, default=2200)
+    parser.add_argument('--recipes', type=int, default=6)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        from django.contrib.auth import get_user_model
+        from rest_framework.test import APIClient
+
+        from api.compression import brotli, compress
+
+        seed(max(args.recipes, 50), ingredients=args.ingredients)
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.first())
+        payloads = (
+            ('ингредиенты', client.get('/api/ingredients/').content),
+            ('рецепты', client.get(
+                '/api/recipes/', {'limit': args.recipes}
+            ).content),
+        )
+
+        rows = [('без сжатия', *(
+            value
+            for _, content in payloads for value in (size(len(content)), '-')
+        ))]
+        for encoding, level in LEVELS:
+            if encoding == 'br' and brotli is None:
+                continue
+            options = (
+                {'brotli_quality': level} if encoding == 'br'
+                else {'gzip_level': level}
+            )
+            row = [f'{encoding} {level}']
+            for _, content in payloads:
+                compressed = compress(content, encoding, **options)
+                repeat = args.repeat if level < 11 else 3
+                elapsed = measure(
+                    lambda: compress(content, encoding, **options), repeat
+                )
+                row.extend((size(len(compressed)), f'{elapsed:.2f} мс'))
+            rows.append(row)
+        print_table(
+            ('алгоритм', *(
+                header for name, _ in payloads for header in (name, 'время')
+            )),
+            rows
+        )
+
+
+if __name__ == '__main__':
+    main()
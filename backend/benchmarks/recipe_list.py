@@ -0,0 +1,71 @@
+"""Время ответа /api/recipes/ с кешем фрагментов рецептов и без него.
+
+Страницы по 6, 50 и 100 рецептов. "без кеша" - каждый фрагмент
+собирается заново, "холодный" - кеш очищается перед запросом,
+"с кешем" - фрагменты уже лежат в кеше. Замеры повторяются для
+сериализаторов DRF и быстрого пути (FAST_SERIALIZERS).
+"""
+import argparse
+from unittest import mock
+
+from benchmarks.base import benchmark_database, measure, print_table, seed
+
+
+PAGE_SIZES = (6, 50, 100)
+
+
+def build_all(recipes, build, prefix=''):
+    return {recipe.pk: build(recipe) for recipe in recipes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--recipes', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        from django.contrib.auth import get_user_model
+        from django.core.cache import cache
+        from django.test import override_settings
+        from rest_framework.test import APIClient
+
+        seed(args.recipes)
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.first())
+
+        rows = []
+        for fast, limit in (
+            (fast, limit) for fast in (False, True) for limit in PAGE_SIZES
+        ):
+            def get_page():
+                response = client.get('/api/recipes/', {'limit': limit})
+                assert response.status_code == 200
+
+            def get_cold_page():
+                cache.clear()
+                get_page()
+
+            with override_settings(FAST_SERIALIZERS=fast):
+                with mock.patch(
+                    'api.serializers.get_recipe_fragments', build_all
+                ):
+                    uncached = measure(get_page, args.repeat)
+                cold = measure(get_cold_page, args.repeat)
+                cached = measure(get_page, args.repeat)
+            rows.append((
+                'fast' if fast else 'drf', limit,
+                f'{uncached:.1f}', f'{cold:.1f}', f'{cached:.1f}',
+                f'{uncached / cached:.1f}x',
+            ))
+        print_table(
+            (
+                'serializers', 'limit', 'без кеша, мс', 'холодный, мс',
+                'с кешем, мс', 'ускорение',
+            ),
+            rows
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""JSONRenderer/JSONParser DRF против FastJSONRenderer/FastJSONParser.
+
+Полезная нагрузка - весь справочник ингредиентов и страница из 100
+рецептов в том виде, в каком их отдает API.
+"""
+import argparse
+import io
+
+from benchmarks.base import benchmark_database, measure, print_table, seed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ingredients', type=int, default=2200)
+    parser.add_argument('--recipes', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        from django.contrib.auth import get_user_model
+        from rest_framework.parsers import JSONParser
+        from rest_framework.renderers import JSONRenderer
+        from rest_framework.test import APIClient
+
+        from api.parsers import FastJSONParser
+        from api.renderers import FastJSONRenderer
+
+        seed(args.recipes, ingredients=args.ingredients)
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.first())
+        payloads = (
+            ('ингредиенты', client.get('/api/ingredients/').json()),
+            ('рецепты', client.get(
+                '/api/recipes/', {'limit': args.recipes}
+            ).json()),
+        )
+
+        rows = []
+        for name, data in payloads:
+            drf = JSONRenderer().render(data, 'application/json')
+            fast = FastJSONRenderer().render(data, 'application/json')
+            render_drf = measure(
+                lambda: JSONRenderer().render(data), args.repeat
+            )
+            render_fast = measure(
+                lambda: FastJSONRenderer().render(data), args.repeat
+            )
+            parse_drf = measure(
+                lambda: JSONParser().parse(io.BytesIO(fast)), args.repeat
+            )
+            parse_fast = measure(
+                lambda: FastJSONParser().parse(io.BytesIO(fast)), args.repeat
+            )
+            rows.append((
+                name, f'{len(drf) / 1024:.1f}', f'{len(fast) / 1024:.1f}',
+                f'{render_drf:.2f}', f'{render_fast:.2f}',
+                f'{parse_drf:.2f}', f'{parse_fast:.2f}',
+            ))
+        print_table(
+            (
+                'данные', 'drf, КБ', 'fast, КБ', 'render drf, мс',
+                'render fast, мс', 'parse drf, мс', 'parse fast, мс',
+            ),
+            rows
+        )
+
+
+if __name__ == '__main__':
+    main()
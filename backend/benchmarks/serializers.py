@@ -0,0 +1,77 @@
+"""Сериализаторы DRF против быстрого пути FAST_SERIALIZERS.
+
+Замеряется только сериализация уже загруженных объектов: рецепты
+страницы списка (RecipeReadSerializer, кеш фрагментов отключен),
+краткие рецепты (RecipeShortSerializer) и весь справочник
+ингредиентов (IngredientSerializer).
+"""
+import argparse
+from unittest import mock
+
+from benchmarks.base import benchmark_database, measure, print_table, seed
+
+
+def build_all(recipes, build, prefix=''):
+    return {recipe.pk: build(recipe) for recipe in recipes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--recipes', type=int, default=100)
+    parser.add_argument('--ingredients', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        from django.contrib.auth import get_user_model
+        from django.test import override_settings
+        from rest_framework.request import Request
+        from rest_framework.test import APIRequestFactory
+
+        from api.serializers import (
+            IngredientSerializer,
+            RecipeReadSerializer,
+            RecipeShortSerializer,
+        )
+        from api.views import RecipesViewSet
+        from recipes.models import Ingredient, Recipe
+
+        seed(args.recipes, ingredients=args.ingredients)
+        request = Request(APIRequestFactory().get('/api/recipes/'))
+        request.user = get_user_model().objects.first()
+        context = {'request': request}
+        recipes = list(RecipesViewSet(action='list').get_queryset())
+        short_recipes = list(Recipe.objects.all())
+        ingredients = list(Ingredient.objects.all())
+        cases = (
+            ('RecipeReadSerializer', lambda: RecipeReadSerializer(
+                recipes, many=True, context=context
+            ).data),
+            ('RecipeShortSerializer', lambda: RecipeShortSerializer(
+                short_recipes, many=True, context=context
+            ).data),
+            ('IngredientSerializer', lambda: IngredientSerializer(
+                ingredients, many=True
+            ).data),
+        )
+
+        rows = []
+        with mock.patch('api.serializers.get_recipe_fragments', build_all):
+            for name, serialize in cases:
+                timings = []
+                for fast in (False, True):
+                    with override_settings(FAST_SERIALIZERS=fast):
+                        timings.append(measure(serialize, args.repeat))
+                drf, fast = timings
+                rows.append((
+                    name, len(serialize()), f'{drf:.2f}', f'{fast:.2f}',
+                    f'{drf / fast:.1f}x',
+                ))
+        print_table(
+            ('сериализатор', 'объектов', 'drf, мс', 'fast, мс', 'ускорение'),
+            rows
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Пропускная способность редиректа /r/<slug>/ под параллельной нагрузкой.
+
+Запросы идут через весь стек Django из нескольких потоков. Режимы:
+"db" - поиск рецепта в БД на каждый запрос, как до кеша ссылок;
+"shared" - кеш процесса отключен, id берется из общего кеша;
+"local" - id берется из LRU-кеша процесса. Доля запросов к
+несуществующим ссылкам задается --missing.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+import random
+import time
+from unittest import mock
+
+from benchmarks.base import benchmark_database, print_table, seed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--recipes', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--missing', type=float, default=0.1)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        from django.core.cache import cache
+        from django.db import connection
+        from django.test import Client
+
+        from api.cache import short_link_cache
+        from recipes.models import Recipe
+
+        seed(args.recipes, per_recipe=1)
+        rng = random.Random(0)
+        known = list(Recipe.objects.values_list('slug', flat=True))
+        slugs = [
+            f'missing{rng.randrange(100)}' if rng.random() < args.missing
+            else rng.choice(known)
+            for _ in range(args.requests)
+        ]
+
+        def db_lookup(slug):
+            return Recipe.objects.filter(slug=slug).values_list(
+                'id', flat=True
+            ).first()
+
+        def run(chunk):
+            client = Client()
+            try:
+                for slug in chunk:
+                    response = client.get(f'/r/{slug}/')
+                    assert response.status_code in (302, 404)
+            finally:
+                connection.close()
+
+        def throughput():
+            chunks = [
+                slugs[index::args.threads] for index in range(args.threads)
+            ]
+            start = time.perf_counter()
+            with ThreadPoolExecutor(args.threads) as executor:
+                list(executor.map(run, chunks))
+            return len(slugs) / (time.perf_counter() - start)
+
+        modes = (
+            ('db', mock.patch('recipes.views.resolve_short_link', db_lookup)),
+            ('shared', mock.patch.object(
+                short_link_cache, 'get', return_value=None
+            )),
+            ('local', nullcontext()),
+        )
+        rows = []
+        for name, patch in modes:
+            cache.clear()
+            short_link_cache.data.clear()
+            with patch:
+                throughput()
+                rows.append((name, f'{throughput():.0f}'))
+        print_table(('режим', 'запросов/с'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Фильтрация рецептов по 1-5 тегам: JOIN с DISTINCT против EXISTS.
+
+"join" - прежний фильтр tags__slug__in с distinct(), "exists" -
+RecipeFilter с подзапросом EXISTS и слагами из индекса в памяти.
+Для каждого числа тегов замеряются COUNT и первая страница ленты.
+"""
+import argparse
+
+from benchmarks.base import benchmark_database, measure, print_table, seed
+
+
+TAG_COUNTS = (1, 2, 3, 4, 5)
+PAGE_SIZE = 6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--recipes', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        from api.filters import RecipeFilter
+        from recipes.models import Recipe, Tag
+
+        seed(args.recipes, per_recipe=1)
+        slugs = list(
+            Tag.objects.order_by('id').values_list('slug', flat=True)
+        )
+
+        def join_queryset(selected):
+            return Recipe.objects.filter(tags__slug__in=selected).distinct()
+
+        def exists_queryset(selected):
+            return RecipeFilter(
+                {'tags': selected}, queryset=Recipe.objects.all()
+            ).qs
+
+        rows = []
+        for count in TAG_COUNTS:
+            selected = slugs[:count]
+            row = [count]
+            results = []
+            for build in (join_queryset, exists_queryset):
+                def count_recipes():
+                    return build(selected).count()
+
+                def first_page():
+                    return list(build(selected).order_by(
+                        '-pub_date', '-id'
+                    )[:PAGE_SIZE].values_list('id', flat=True))
+
+                results.append((count_recipes(), first_page()))
+                row.append(f'{measure(count_recipes, args.repeat):.1f}')
+                row.append(f'{measure(first_page, args.repeat):.1f}')
+            assert results[0] == results[1], 'Результаты фильтров различны'
+            row.append(results[1][0])
+            rows.append(row)
+        print_table(
+            (
+                'теги', 'join count, мс', 'join page, мс',
+                'exists count, мс', 'exists page, мс', 'рецептов',
+            ),
+            rows
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,4 @@
 from django.contrib import admin
-from django.db.models import Count
 
 from recipes.models import (
     Favorite,
@@ -7,6 +6,7 @@ from recipes.models import (
     IngredientInRecipe,
     Recipe,
     ShoppingCart,
+    ShortLinkAlias,
     Tag,
 )
 
@@ -49,16 +49,8 @@ class RecipeAdmin(admin.ModelAdmin):
     ordering = ('-pub_date',)
     empty_value_display = 'Новый рецепт'
 
-    @admin.display(description='Количество в избранном')
-    def favorite_count(self, obj):
-        """Метод для подсчета количества добавлений в избранное."""
-        return obj.favorite_count
-
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
-        queryset = queryset.annotate(
-            favorite_count=Count('favorite_recipe')
-        )
         return queryset.select_related(
             'author').prefetch_related('ingredients', 'tags')
 
@@ -79,3 +71,13 @@ class ShoppingCartAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
         return queryset.select_related('user', 'recipe')
+
+
+@admin.register(ShortLinkAlias)
+class ShortLinkAliasAdmin(admin.ModelAdmin):
+    list_display = ('slug', 'recipe')
+    search_fields = ('slug',)
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return queryset.select_related('recipe')
@@ -1,4 +1,6 @@
-GENERATE_LENGTH = 20
+SHORT_LINK_CODE_LENGTH = 8
+SHORT_LINK_ATTEMPTS = 5
+SHORT_LINK_BATCH_SIZE = 1000
 TAG_LENGTH = 32
 INGREDIENT_LENGTH = 128
 MEASUREMENT_UNIT_LENGTH = 64
@@ -10,3 +12,4 @@ MAX_COOKING_TIME = 15000
 MAX_INGREDIENT_AMOUNT = 10000
 SHORT_LINK = 20
 TAG_NAME_LENGTH = 20
+COUNTER_BATCH_SIZE = 1000
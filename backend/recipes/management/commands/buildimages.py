@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from api.images import IMAGE_FIELDS, process_image
+
+
+class Command(BaseCommand):
+    help = "Построить варианты изображений рецептов и аватаров"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Перестроить и уже готовые варианты',
+        )
+
+    def handle(self, *args, **options):
+        for model, (field, _, _) in IMAGE_FIELDS.items():
+            pks = model.objects.exclude(
+                **{f'{field}__isnull': True}
+            ).exclude(**{field: ''}).values_list('pk', flat=True)
+            for pk in pks.iterator():
+                process_image(model, pk, force=options['force'])
+        self.stdout.write("Варианты изображений построены")
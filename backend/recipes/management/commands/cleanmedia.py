@@ -0,0 +1,67 @@
+from datetime import timedelta
+import os
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.constants import MEDIA_CLEANUP_GRACE_PERIOD
+from api.images import IMAGE_FIELDS
+
+
+def referenced_media():
+    """Имена всех файлов, на которые ссылаются объекты в БД."""
+    names = set()
+    for model, (field, variants_field, _) in IMAGE_FIELDS.items():
+        rows = model.objects.values_list(field, variants_field)
+        for name, variants in rows.iterator():
+            if name:
+                names.add(name)
+            for formats in (variants or {}).get('variants', {}).values():
+                names.update(formats.values())
+    return names
+
+
+def walk(directory):
+    if not default_storage.exists(directory):
+        return
+    directories, files = default_storage.listdir(directory)
+    for name in files:
+        yield os.path.join(directory, name)
+    for name in directories:
+        yield from walk(os.path.join(directory, name))
+
+
+class Command(BaseCommand):
+    help = "Удалить файлы медиа, не используемые рецептами и пользователями"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только вывести файлы, которые будут удалены',
+        )
+        parser.add_argument(
+            '--grace',
+            type=int,
+            default=MEDIA_CLEANUP_GRACE_PERIOD,
+            help='Не трогать файлы моложе указанного числа секунд',
+        )
+
+    def handle(self, *args, **options):
+        referenced = referenced_media()
+        cutoff = timezone.now() - timedelta(seconds=options['grace'])
+        removed = 0
+        for model, (field, _, _) in IMAGE_FIELDS.items():
+            directory = model._meta.get_field(field).upload_to.rstrip('/')
+            for name in walk(directory):
+                if name in referenced:
+                    continue
+                if default_storage.get_modified_time(name) > cutoff:
+                    continue
+                if options['dry_run']:
+                    self.stdout.write(name)
+                else:
+                    default_storage.delete(name)
+                removed += 1
+        self.stdout.write(f"Удалено неиспользуемых файлов: {removed}")
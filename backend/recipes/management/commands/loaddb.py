@@ -4,6 +4,7 @@ import os
 from django.conf import settings
 from django.core.management.base import BaseCommand
 
+from api.cache import bump_catalog_version
 from recipes.models import Ingredient, Tag
 
 
@@ -42,4 +43,5 @@ class Command(BaseCommand):
             with open(path, 'r', encoding='utf-8') as file:
                 reader = csv.reader(file)
                 func(list(reader))
+        bump_catalog_version()
         self.stdout.write("!!!База данных загружена успешно!!!")
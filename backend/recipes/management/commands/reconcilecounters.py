@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from recipes.constants import COUNTER_BATCH_SIZE
+from recipes.models import Favorite, Recipe, ShoppingCart
+
+
+User = get_user_model()
+
+
+def count_related(model, field):
+    """Число строк model, ссылающихся через field на текущую запись."""
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')}).order_by().values(
+            field
+        ).annotate(total=Count('pk')).values('total'),
+        output_field=IntegerField()
+    ), 0)
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитать счетчики избранного, списков покупок и рецептов "
+        "автора. Обновляются только строки с расхождением."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=COUNTER_BATCH_SIZE,
+            help="Число строк, проверяемых одним запросом."
+        )
+
+    def reconcile(self, model, field, actual, batch_size):
+        """Пересчет счетчика диапазонами id по batch_size строк."""
+        last_pk = model.objects.aggregate(last=Max('pk'))['last'] or 0
+        fixed = 0
+        for start in range(0, last_pk + 1, batch_size):
+            fixed += model.objects.filter(
+                pk__gte=start, pk__lt=start + batch_size
+            ).exclude(**{field: actual}).update(**{field: actual})
+        self.stdout.write(f"{model.__name__}.{field}: исправлено {fixed}")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        self.reconcile(
+            Recipe, 'favorite_count',
+            count_related(Favorite, 'recipe'), batch_size
+        )
+        self.reconcile(
+            Recipe, 'shopping_cart_count',
+            count_related(ShoppingCart, 'recipe'), batch_size
+        )
+        self.reconcile(
+            User, 'recipes_count',
+            count_related(Recipe, 'author'), batch_size
+        )
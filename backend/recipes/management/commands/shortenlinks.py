@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.cache import forget_short_links
+from recipes.constants import SHORT_LINK_BATCH_SIZE, SHORT_LINK_CODE_LENGTH
+from recipes.models import Recipe, ShortLinkAlias, generate_short_link
+
+
+class Command(BaseCommand):
+    help = (
+        "Заменить длинные slug коротких ссылок на коды base62. "
+        "Прежние ссылки сохраняются как ShortLinkAlias и продолжают "
+        "вести на рецепт."
+    )
+
+    def save_batch(self, recipes, aliases):
+        Recipe.objects.bulk_update(recipes, ['slug'])
+        ShortLinkAlias.objects.bulk_create(aliases)
+        # Новые коды могли быть закешированы как несуществующие.
+        forget_short_links(*(recipe.slug for recipe in recipes))
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        used = set(Recipe.objects.values_list('slug', flat=True))
+        used.update(ShortLinkAlias.objects.values_list('slug', flat=True))
+        recipes = Recipe.objects.exclude(
+            slug__regex=rf'^[0-9A-Za-z]{{{SHORT_LINK_CODE_LENGTH}}}$'
+        ).only('id', 'slug')
+        batch = []
+        aliases = []
+        updated = 0
+        for recipe in recipes.iterator():
+            slug = generate_short_link()
+            while slug in used:
+                slug = generate_short_link()
+            used.add(slug)
+            aliases.append(ShortLinkAlias(slug=recipe.slug, recipe=recipe))
+            recipe.slug = slug
+            batch.append(recipe)
+            if len(batch) == SHORT_LINK_BATCH_SIZE:
+                self.save_batch(batch, aliases)
+                updated += len(batch)
+                batch = []
+                aliases = []
+        if batch:
+            self.save_batch(batch, aliases)
+            updated += len(batch)
+        self.stdout.write(f"Обновлено коротких ссылок: {updated}")
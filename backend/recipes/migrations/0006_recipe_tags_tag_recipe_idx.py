@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0005_recipe_pub_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                'CREATE INDEX IF NOT EXISTS recipe_tags_tag_recipe_idx '
+                'ON recipes_recipe_tags (tag_id, recipe_id);'
+            ),
+            reverse_sql='DROP INDEX IF EXISTS recipe_tags_tag_recipe_idx;',
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 3.2 on 2026-10-18 02:24
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_recipe_lists(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    counters = {
+        'favorite_count': apps.get_model('recipes', 'Favorite'),
+        'shopping_cart_count': apps.get_model('recipes', 'ShoppingCart'),
+    }
+    Recipe.objects.update(**{
+        field: Coalesce(Subquery(
+            model.objects.filter(recipe=OuterRef('pk')).order_by().values(
+                'recipe'
+            ).annotate(total=Count('pk')).values('total'),
+            output_field=IntegerField()
+        ), 0)
+        for field, model in counters.items()
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_recipe_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='favorite_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество в избранном'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='shopping_cart_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество в списках покупок'),
+        ),
+        migrations.RunPython(
+            count_recipe_lists, migrations.RunPython.noop
+        ),
+    ]
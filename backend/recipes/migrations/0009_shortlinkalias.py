@@ -0,0 +1,26 @@
+# Generated by Django 3.2 on 2026-10-18 02:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_recipe_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShortLinkAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slug', models.SlugField(max_length=20, unique=True, verbose_name='Прежний слаг')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='short_link_aliases', to='recipes.recipe', verbose_name='Рецепт')),
+            ],
+            options={
+                'verbose_name': 'Прежняя короткая ссылка',
+                'verbose_name_plural': 'Прежние короткие ссылки',
+            },
+        ),
+    ]
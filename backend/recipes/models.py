@@ -1,11 +1,11 @@
-import uuid
+import secrets
+import string
 
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import IntegrityError, models, transaction
 
 from recipes.constants import (
-    GENERATE_LENGTH,
     INGREDIENT_LENGTH,
     MAX_COOKING_TIME,
     MAX_INGREDIENT_AMOUNT,
@@ -15,6 +15,8 @@ from recipes.constants import (
     RECIPE_LENGTH,
     RECIPE_NAME_LENGTH,
     SHORT_LINK,
+    SHORT_LINK_ATTEMPTS,
+    SHORT_LINK_CODE_LENGTH,
     TAG_LENGTH,
     TAG_NAME_LENGTH,
 )
@@ -67,6 +69,17 @@ class Ingredient(models.Model):
         return f'{self.name}, {self.measurement_unit}'
 
 
+SHORT_LINK_ALPHABET = string.digits + string.ascii_letters
+
+
+def generate_short_link():
+    """Случайный код короткой ссылки из символов base62."""
+    return ''.join(
+        secrets.choice(SHORT_LINK_ALPHABET)
+        for _ in range(SHORT_LINK_CODE_LENGTH)
+    )
+
+
 class Recipe(models.Model):
     """Модель для описания рецепта."""
 
@@ -85,6 +98,12 @@ class Recipe(models.Model):
         verbose_name='Фотография рецепта',
         upload_to='recipes/',
     )
+    image_variants = models.JSONField(
+        verbose_name='Варианты изображения',
+        default=dict,
+        blank=True,
+        editable=False,
+    )
     text = models.TextField(
         verbose_name='Описание рецепта'
     )
@@ -123,27 +142,54 @@ class Recipe(models.Model):
         unique=True,
         editable=False
     )
+    favorite_count = models.PositiveIntegerField(
+        verbose_name='Количество в избранном',
+        default=0,
+        editable=False
+    )
+    shopping_cart_count = models.PositiveIntegerField(
+        verbose_name='Количество в списках покупок',
+        default=0,
+        editable=False
+    )
 
     class Meta:
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='recipe_pub_date_id_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name[:RECIPE_NAME_LENGTH]
 
     def save(self, *args, **kwargs):
-        """Генерация уникального slug перед сохранением."""
-        if not self.slug:
-            self.slug = self._generate_unique_slug()
-        super().save(*args, **kwargs)
-
-    def _generate_unique_slug(self):
-        """Генерирует уникальный slug с проверкой в базе."""
-        while True:
-            slug = uuid.uuid4().hex[:GENERATE_LENGTH]
-            if not Recipe.objects.filter(slug=slug).exists():
-                return slug
+        """Генерация короткой ссылки при создании рецепта.
+
+        Уникальность обеспечивает индекс на slug, точка сохранения на
+        каждую вставку не создается. Вне транзакции вставка при
+        совпадении кода повторяется с новым кодом. Внутри транзакции
+        ошибка прерывает ее целиком, поэтому повторяет всю транзакцию
+        вызывающий код (RecipeWriteSerializer.create).
+        """
+        if self.slug:
+            return super().save(*args, **kwargs)
+        in_transaction = transaction.get_connection(
+            kwargs.get('using')
+        ).in_atomic_block
+        attempts = 1 if in_transaction else SHORT_LINK_ATTEMPTS
+        for attempt in range(attempts):
+            self.slug = generate_short_link()
+            try:
+                return super().save(*args, **kwargs)
+            except IntegrityError:
+                self.slug = ''
+                if attempt == attempts - 1:
+                    raise
 
 
 class IngredientInRecipe(models.Model):
@@ -232,3 +278,26 @@ class Favorite(BaseShopping):
     class Meta(BaseShopping.Meta):
         verbose_name = 'Избранное'
         verbose_name_plural = 'Избранное'
+
+
+class ShortLinkAlias(models.Model):
+    """Прежняя короткая ссылка рецепта, которая продолжает работать."""
+
+    slug = models.SlugField(
+        max_length=SHORT_LINK,
+        unique=True,
+        verbose_name='Прежний слаг'
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='short_link_aliases',
+        verbose_name='Рецепт'
+    )
+
+    class Meta:
+        verbose_name = 'Прежняя короткая ссылка'
+        verbose_name_plural = 'Прежние короткие ссылки'
+
+    def __str__(self):
+        return f'{self.slug} -> {self.recipe_id}'
@@ -1,10 +1,25 @@
-from django.http import HttpResponseRedirect
-from django.shortcuts import get_object_or_404
+from django.http import HttpResponseNotFound, HttpResponseRedirect
+from django.utils.cache import patch_cache_control
 
-from recipes.models import Recipe
+from api.cache import resolve_short_link
+from api.constants import (
+    SHORT_LINK_MISSING_TIMEOUT,
+    SHORT_LINK_REDIRECT_MAX_AGE,
+)
 
 
 def recipe_redirect(request, slug):
-    """Простой редирект без бесконечных циклов"""
-    recipe = get_object_or_404(Recipe, slug=slug)
-    return HttpResponseRedirect(f'/recipes/{recipe.id}/')
+    """Простой редирект без бесконечных циклов.
+
+    id рецепта берется из кеша коротких ссылок, ответ можно кешировать
+    в nginx.
+    """
+    recipe_id = resolve_short_link(slug)
+    if recipe_id is None:
+        response = HttpResponseNotFound()
+        max_age = SHORT_LINK_MISSING_TIMEOUT
+    else:
+        response = HttpResponseRedirect(f'/recipes/{recipe_id}/')
+        max_age = SHORT_LINK_REDIRECT_MAX_AGE
+    patch_cache_control(response, public=True, max_age=max_age)
+    return response
@@ -0,0 +1,35 @@
+# Generated by Django 3.2 on 2026-10-18 02:24
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_user_recipes(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    Recipe = apps.get_model('recipes', 'Recipe')
+    User.objects.update(recipes_count=Coalesce(Subquery(
+        Recipe.objects.filter(author=OuterRef('pk')).order_by().values(
+            'author'
+        ).annotate(total=Count('pk')).values('total'),
+        output_field=IntegerField()
+    ), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_recipe_counters'),
+        ('users', '0002_user_avatar_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='recipes_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество рецептов'),
+        ),
+        migrations.RunPython(
+            count_user_recipes, migrations.RunPython.noop
+        ),
+    ]
@@ -36,6 +36,17 @@ class User(AbstractUser):
         null=True,
         blank=True,
     )
+    avatar_variants = models.JSONField(
+        verbose_name='Варианты аватара',
+        default=dict,
+        blank=True,
+        editable=False,
+    )
+    recipes_count = models.PositiveIntegerField(
+        verbose_name='Количество рецептов',
+        default=0,
+        editable=False,
+    )
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ('username', 'first_name', 'last_name')
@@ -67,12 +78,15 @@ class Subscription(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     @classmethod
-    def is_subscribed(cls, user, author):
-        """Проверка подписки."""
-        return user.is_authenticated and cls.objects.filter(
-            user=user,
-            author=author
-        ).exists()
+    def subscribed_author_ids(cls, user):
+        """Множество id авторов, на которых подписан пользователь."""
+        if not user.is_authenticated:
+            return frozenset()
+        return frozenset(
+            cls.objects.filter(user=user).order_by().values_list(
+                'author_id', flat=True
+            )
+        )
 
     class Meta:
         verbose_name = "Подписка"